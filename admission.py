@@ -0,0 +1,202 @@
+import socket
+import threading
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from time import monotonic
+from typing import Callable, Deque, Dict, Iterator, Optional
+
+from salto.audit.audit_cursor import CursorStore
+from salto.audit.audit_record import AuditRecord
+from salto.audit.audit_trail import AuditWalk
+from salto.client import Client
+from salto.instrumentation import Histogram
+from salto.message import Message
+from salto.response import Response
+
+
+# Priority-aware admission of requests to a single Salto interface, so guest facing encoding is not held up by night audit
+# batches or audit trail polling. Every request belongs to a class:
+#   interactive  keys and card reads at the desk (CN, CC, CA, LT, L, P)
+#   bulk         checkouts and mobile keys (CO, CNM, CCM)
+#   background   audit trail polling (WF, WN, WR)
+#
+# Each class has its own concurrency and rate budget within the overall concurrency of the interface. A class waits while a
+# higher class has requests waiting which its budget allows to run. Audit trails are walked one step at a time, so a long
+# walk yields to the desk between two 'WN' steps.
+#
+# admission = AdmissionController(client)
+# admission.send_message(EncodeCard(amount=1, encoder="Online Encoder 1", rooms=["Room 1"]))  # interactive
+# for audit_record in admission.audit_trail("Room 214"):  # background
+#     ...
+# admission.stats()["interactive"]["queue_wait"]["p99"]
+class AdmissionController:
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+    BACKGROUND = "background"
+    PRIORITIES = (INTERACTIVE, BULK, BACKGROUND)  # highest first
+
+    MAX_CONCURRENCY = 2  # requests in flight on the interface, all classes combined
+    COMMAND_PRIORITIES: Dict[str, str] = {
+        "CN": INTERACTIVE, "CC": INTERACTIVE, "CA": INTERACTIVE, "LT": INTERACTIVE, "L": INTERACTIVE, "P": INTERACTIVE,
+        "CO": BULK, "CNM": BULK, "CCM": BULK,
+        "WF": BACKGROUND, "WN": BACKGROUND, "WR": BACKGROUND,
+    }
+
+    # Concurrency and rate (requests per second, None for unlimited) of a class. The rate allows bursts of `burst` requests.
+    class Budget:
+        def __init__(self, concurrency: int, rate: Optional[float] = None, burst: Optional[float] = None):
+            self.concurrency = concurrency
+            self.rate = rate
+            self.burst = max(1.0, burst if burst is not None else (rate or 1.0))
+            self.tokens = self.burst
+            self.updated_at = monotonic()
+
+        # Seconds until the rate allows another request
+        def delay(self, now: float) -> float:
+            if self.rate is None:
+                return 0.0
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+        def take(self) -> None:
+            if self.rate is not None:
+                self.tokens -= 1
+
+    class UnknownPriority(ValueError):
+        pass
+
+    def __init__(self, client: Client, max_concurrency: int = MAX_CONCURRENCY, budgets: Optional[Dict[str, "AdmissionController.Budget"]] = None):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.budgets: Dict[str, AdmissionController.Budget] = budgets or {
+            AdmissionController.INTERACTIVE: AdmissionController.Budget(concurrency=max_concurrency),
+            AdmissionController.BULK: AdmissionController.Budget(concurrency=1, rate=10.0),
+            AdmissionController.BACKGROUND: AdmissionController.Budget(concurrency=1, rate=5.0),
+        }
+
+        self._condition = threading.Condition()
+        self._running: Dict[str, int] = {priority: 0 for priority in AdmissionController.PRIORITIES}
+        self._waiting: Dict[str, Deque[object]] = {priority: deque() for priority in AdmissionController.PRIORITIES}
+        self._admitted: Dict[str, int] = {priority: 0 for priority in AdmissionController.PRIORITIES}
+        self._queue_waits: Dict[str, Histogram] = {priority: Histogram() for priority in AdmissionController.PRIORITIES}
+
+    @staticmethod
+    def classify(message: Message) -> str:
+        command = getattr(message, "COMMAND_NAME", None) or message.str_field(0)
+        return AdmissionController.COMMAND_PRIORITIES.get(command, AdmissionController.BULK)
+
+    def send_message(self, message: Message, priority: Optional[str] = None) -> Response:
+        with self.admit(priority or AdmissionController.classify(message)):
+            return self.client.send_message(message)
+
+    # Walks the audit trail of a door as background work, admitting every step on its own. The walk keeps one socket for
+    # all its steps. A pooled socket is handed back between two steps when a higher class is waiting or running, as that
+    # request may need the socket, and before the walk waits for admission; the next step then borrows one again.
+    def audit_trail(self, door_identification: str, cursor_store: Optional[CursorStore] = None) -> Iterator[AuditRecord]:
+        client = self.client
+        walk = AuditWalk(door_identification, cursor_store)
+        with ExitStack() as held:
+            conn: Optional[socket.socket] = None
+
+            def hand_back() -> None:
+                nonlocal conn
+                if conn is not None and client.pool is not None:
+                    held.close()
+                    conn = None
+
+            try:
+                while not walk.is_finished:
+                    if self._is_contended(AdmissionController.BACKGROUND):
+                        hand_back()
+                    with self.admit(AdmissionController.BACKGROUND, on_wait=hand_back):
+                        if conn is None:
+                            conn = held.enter_context(client.connection())
+                        response = client._send_on(conn, client.encode_message(walk.next_message()))
+
+                    audit_record = response.audit_record
+                    if walk.accept(audit_record):
+                        yield audit_record
+                        walk.commit()
+            finally:
+                walk.save()
+
+    # Blocks until the class may send a request, for the duration of the block. `on_wait` is called when the request has to
+    # wait, e.g. to give up resources the requests it waits for may need.
+    @contextmanager
+    def admit(self, priority: str, on_wait: Optional[Callable[[], None]] = None) -> Iterator[None]:
+        self._acquire(priority, on_wait)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    # Per class: requests running and waiting, requests admitted so far and the time they waited to be admitted
+    def stats(self) -> Dict[str, dict]:
+        with self._condition:
+            return {
+                priority: {
+                    "running": self._running[priority],
+                    "waiting": len(self._waiting[priority]),
+                    "admitted": self._admitted[priority],
+                    "queue_wait": self._queue_waits[priority].to_dict(),
+                }
+                for priority in AdmissionController.PRIORITIES
+            }
+
+    def _acquire(self, priority: str, on_wait: Optional[Callable[[], None]] = None) -> None:
+        if priority not in self._waiting:
+            raise AdmissionController.UnknownPriority(f"Unknown priority class: {priority!r}")
+
+        ticket = object()
+        started = monotonic()
+        with self._condition:
+            waiting = self._waiting[priority]
+            waiting.append(ticket)
+            try:
+                while True:
+                    delay = self._delay(priority, ticket)
+                    if delay == 0:
+                        break
+                    if on_wait is not None:
+                        on_wait()
+                        on_wait = None
+                    self._condition.wait(delay)
+            except BaseException:
+                waiting.remove(ticket)
+                self._condition.notify_all()
+                raise
+
+            waiting.popleft()
+            self.budgets[priority].take()
+            self._running[priority] += 1
+            self._admitted[priority] += 1
+            self._queue_waits[priority].observe(monotonic() - started)
+            self._condition.notify_all()  # the next request of the class may be admissible as well
+
+    def _release(self, priority: str) -> None:
+        with self._condition:
+            self._running[priority] -= 1
+            self._condition.notify_all()
+
+    # 0 when the ticket may run now, otherwise the seconds to wait for (None: until a request finishes)
+    def _delay(self, priority: str, ticket: object) -> Optional[float]:
+        if self._waiting[priority][0] is not ticket:
+            return None  # first come, first served within a class
+        if sum(self._running.values()) >= self.max_concurrency or not self._has_room(priority):
+            return None
+
+        for higher_priority in AdmissionController.PRIORITIES[:AdmissionController.PRIORITIES.index(priority)]:
+            if self._waiting[higher_priority] and self._has_room(higher_priority):
+                return None
+
+        return self.budgets[priority].delay(monotonic()) or 0
+
+    # Whether a class above the given one has requests waiting or running
+    def _is_contended(self, priority: str) -> bool:
+        with self._condition:
+            return any(self._waiting[higher_priority] or self._running[higher_priority]
+                       for higher_priority in AdmissionController.PRIORITIES[:AdmissionController.PRIORITIES.index(priority)])
+
+    def _has_room(self, priority: str) -> bool:
+        return self._running[priority] < self.budgets[priority].concurrency
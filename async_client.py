@@ -0,0 +1,118 @@
+import asyncio
+from contextlib import asynccontextmanager
+from logging import Logger
+from typing import AsyncIterator, Optional, Tuple
+
+from salto import common
+from salto.capture import WireCapture
+from salto.client import Client
+from salto.message import Message
+from salto.protocol import FrameParser
+from salto.response import Response
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+# asyncio counterpart of Client, sharing its timeouts, retries, encoding and debug output
+class AsyncClient:
+    # client = AsyncClient("192.168.1.120:8090")
+    # response = await client.send_message(Checkout(room="Room 1"))
+    def __init__(self, endpoint: str, logger: Optional[Logger] = None, lrc_skip: bool = False, capture: Optional[WireCapture] = None):
+        self.client = Client(endpoint, logger=logger, lrc_skip=lrc_skip, capture=capture)
+        self.host: str = self.client.host
+        self.port: int = self.client.port
+
+    async def is_ready(self) -> bool:
+        return (await self.send_request(common.ENQ)).is_ack
+
+    async def create_connection(self) -> Connection:
+        if self.client.unix_path is not None:
+            return await asyncio.wait_for(asyncio.open_unix_connection(self.client.unix_path), Client.CONNECT_TIMEOUT)
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), Client.CONNECT_TIMEOUT)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Connection]:
+        reader, writer = await self.create_connection()
+        try:
+            yield reader, writer
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def send_request(self, request: bytes) -> Response:
+        async with self.connection() as conn:
+            return await self._send_request(conn, request)
+
+    async def send_message(self, message: Message) -> Response:
+        return await self.send_request(self.encode_message(message))
+
+    def encode_message(self, message: Message) -> bytes:
+        return self.client.encode_message(message)
+
+    async def _send_request(self, conn: Connection, request: bytes, attempt: int = 1, parser: Optional[FrameParser] = None) -> Response:
+        parser = parser or FrameParser()
+        _, writer = conn
+        self.client._trace(writer, "out", request)
+        writer.write(request)
+        await asyncio.wait_for(writer.drain(), Client.WRITE_TIMEOUT)
+
+        acknowledgement = await self.receive_frame(conn, parser)
+        self.client._trace(writer, "in", acknowledgement)
+
+        if request == common.ENQ and acknowledgement in [common.ACK, common.NAK]:
+            return Response(acknowledgement)
+        elif acknowledgement == common.ACK:
+            return await self.read_stx(conn, parser)
+        elif acknowledgement == common.NAK:
+            if attempt < Client.MAX_RETRIES:
+                await self.await_ready(conn, parser)
+                return await self._send_request(conn, request, attempt + 1, parser)
+            else:
+                return Response(acknowledgement)
+        else:
+            raise Client.InvalidAcknowledgement(f"Invalid SALTO acknowledgement: {acknowledgement!r}")
+
+    async def read_stx(self, conn: Connection, parser: Optional[FrameParser] = None) -> Response:
+        response = await self.receive_frame(conn, parser or FrameParser())
+        self.client._trace(conn[1], "in", response)
+        if not response:
+            raise ConnectionResetError("SALTO interface closed the connection before responding")
+
+        return Response(response)
+
+    async def receive_frame(self, conn: Connection, parser: FrameParser) -> bytes:
+        reader, _ = conn
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Client.READ_TIMEOUT
+        while not parser.has_frame:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("Timed out reading SALTO response")
+
+            chunk = await asyncio.wait_for(reader.read(Client.RECEIVE_SIZE), remaining)
+            if not chunk:
+                return parser.flush()
+            parser.feed(chunk)
+
+        return parser.next_frame()
+
+    async def await_ready(self, conn: Connection, parser: Optional[FrameParser] = None) -> None:
+        parser = parser or FrameParser()
+        _, writer = conn
+        attempt = 1
+        while True:
+            self.client._trace(writer, "out", common.ENQ)
+            writer.write(common.ENQ)
+            await asyncio.wait_for(writer.drain(), Client.WRITE_TIMEOUT)
+
+            acknowledgement = await self.receive_frame(conn, parser)
+            self.client._trace(writer, "in", acknowledgement)
+
+            if acknowledgement == common.ACK or attempt >= Client.MAX_RETRIES:
+                break
+
+            await asyncio.sleep(self.client.backoff.delay(attempt))
+            attempt += 1
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from salto.audit.audit_record import AuditRecord
+
+
+# Position of a poller in the audit trail of a door: the last incidence it has seen
+class AuditCursor:
+    def __init__(self, door_identification: str, last_datetime: Optional[datetime] = None, last_card_identification: Optional[str] = None):
+        self.door_identification = door_identification
+        self.last_datetime = last_datetime
+        self.last_card_identification = last_card_identification
+
+    @property
+    def is_started(self) -> bool:
+        return self.last_datetime is not None
+
+    # Incidences have minute resolution, so one with the same datetime is only considered seen when the card matches as well
+    def has_seen(self, record: AuditRecord) -> bool:
+        if self.last_datetime is None:
+            return False
+        if record.datetime != self.last_datetime:
+            return record.datetime < self.last_datetime
+        return record.card_identification == self.last_card_identification
+
+    def advance(self, record: AuditRecord) -> None:
+        self.last_datetime = record.datetime
+        self.last_card_identification = record.card_identification
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "door_identification": self.door_identification,
+            "last_datetime": self.last_datetime.isoformat() if self.last_datetime else None,
+            "last_card_identification": self.last_card_identification,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "AuditCursor":
+        last_datetime = data.get("last_datetime")
+        return AuditCursor(
+            data["door_identification"],
+            datetime.fromisoformat(last_datetime) if last_datetime else None,
+            data.get("last_card_identification"),
+        )
+
+
+# Persists audit cursors, so a restarted poller continues where it stopped
+class CursorStore(ABC):
+    @abstractmethod
+    def load(self, door_identification: str) -> AuditCursor:
+        ...
+
+    @abstractmethod
+    def save(self, cursor: AuditCursor) -> None:
+        ...
+
+
+# Keeps the cursors of all doors in a single JSON file
+class AuditCursorStore(CursorStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self, door_identification: str) -> AuditCursor:
+        with self._lock:
+            data = self._read().get(door_identification)
+        return AuditCursor.from_dict(data) if data else AuditCursor(door_identification)
+
+    def save(self, cursor: AuditCursor) -> None:
+        with self._lock:
+            cursors = self._read()
+            cursors[cursor.door_identification] = cursor.to_dict()
+
+            # Write to a temporary file first, an interrupted write must not lose the cursors of other doors
+            temporary_path = self.path + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(cursors, file)
+            os.replace(temporary_path, self.path)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
@@ -0,0 +1,78 @@
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from salto.audit.audit_cursor import CursorStore
+from salto.audit.audit_record import AuditRecord
+from salto.audit.audit_trail import AuditTrail
+from salto.client import Client
+
+
+class AuditHarvest:
+    def __init__(self, records: List[AuditRecord], errors: Dict[str, Exception]):
+        self.records = records  # records of all doors, ordered by datetime, including those fetched before a door failed
+        self.errors = errors  # per door identification, doors which failed do not stop the others
+
+
+# Fetches the audit trails of many doors concurrently. The number of connections used for auditing is capped per interface,
+# across all harvesters and their concurrent harvest calls, so front desk encoding on the same interface keeps getting
+# through. The first harvester of an interface sets its cap.
+#
+# harvester = AuditHarvester(client, max_connections=2)
+# harvest = harvester.harvest(["Room 101", "Room 102", "Main entrance"])
+class AuditHarvester:
+    MAX_CONNECTIONS = 2
+
+    class DoorError(Exception):
+        pass
+
+    _slots: Dict[str, threading.BoundedSemaphore] = {}  # audit connections per interface endpoint
+    _slots_lock = threading.Lock()
+
+    def __init__(self, client: Client, max_connections: int = MAX_CONNECTIONS, cursor_store: Optional[CursorStore] = None):
+        self.client = client
+        self.cursor_store = cursor_store
+        with AuditHarvester._slots_lock:
+            self._connections = AuditHarvester._slots.setdefault(client.endpoint, threading.BoundedSemaphore(max_connections))
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="salto-audit")
+
+    def harvest(self, door_identifications: Iterable[str]) -> AuditHarvest:
+        futures = [(door, self._executor.submit(self._fetch_door, door)) for door in door_identifications]
+
+        trails: List[List[AuditRecord]] = []
+        errors: Dict[str, Exception] = {}
+        for door, future in futures:
+            audit_records, error = future.result()
+            trails.append(audit_records)
+            if error is not None:
+                errors[door] = error
+
+        return AuditHarvest(list(heapq.merge(*trails, key=lambda audit_record: audit_record.datetime)), errors)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "AuditHarvester":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    # Returns the incidences of a single door sorted by datetime, and the error which cut the walk short if any. Records
+    # fetched before the error are kept, the cursor store has moved past them already.
+    def _fetch_door(self, door_identification: str) -> Tuple[List[AuditRecord], Optional[Exception]]:
+        audit_records: List[AuditRecord] = []
+        error: Optional[Exception] = None
+        with self._connections:
+            try:
+                for audit_record in AuditTrail.iterate(self.client, door_identification, self.cursor_store):
+                    if audit_record.is_error:
+                        error = AuditHarvester.DoorError(f"SALTO could not send the audit trail of {door_identification!r}")
+                    elif not audit_record.is_end_of_trail:
+                        audit_records.append(audit_record)
+            except Exception as exception:
+                error = exception
+
+        audit_records.sort(key=lambda audit_record: audit_record.datetime)
+        return audit_records, error
@@ -1,4 +1,4 @@
-from datetime import datetime, date
+from datetime import datetime
 from enum import Enum
 from typing import Optional
 
@@ -50,12 +50,22 @@ class AuditRecord:
         if self._datetime is not None:
             return self._datetime
 
-        parsed_datetime = datetime.strptime(f"{self.message.str_field(2)} {self.message.str_field(3)}", AuditRecord.DATETIME_FORMAT)
-        if parsed_datetime > datetime.now():
-            parsed_datetime = add_years(parsed_datetime, -1)
-        self._datetime = parsed_datetime
+        self._datetime = AuditRecord.parse_datetime(self.message.str_field(2), self.message.str_field(3), datetime.now())
         return self._datetime
 
+    # Incidences carry no year: they are placed in the year of the reference clock, or the year before when that would put
+    # them in the future.
+    @staticmethod
+    def parse_datetime(date_field: str, time_field: str, reference: datetime) -> datetime:
+        try:
+            parsed_datetime: Optional[datetime] = datetime.strptime(f"{reference.year} {date_field} {time_field}", "%Y " + AuditRecord.DATETIME_FORMAT)
+        except ValueError:
+            parsed_datetime = None  # 29/02 while the reference year is not a leap year
+
+        if parsed_datetime is None or parsed_datetime > reference:
+            parsed_datetime = datetime.strptime(f"{reference.year - 1} {date_field} {time_field}", "%Y " + AuditRecord.DATETIME_FORMAT)
+        return parsed_datetime
+
     @property
     def incident(self) -> "AuditRecord.Incident":
         if self._incident is not None:
@@ -96,15 +106,3 @@ class AuditRecord:
     def user(self) -> str:
         return self.message.str_field(8)
 
-
-# https://stackoverflow.com/questions/15741618/add-one-year-in-current-date-python
-def add_years(d: datetime, years: int) -> datetime:
-    """Return a date that's `years` years after the date (or datetime)
-    object `d`. Return the same calendar date (month and day) in the
-    destination year, if it exists, otherwise use the following day
-    (thus changing February 29 to March 1).
-    """
-    try:
-        return d.replace(year=d.year + years)
-    except ValueError:
-        return d + (date(d.year + years, 1, 1) - date(d.year, 1, 1))
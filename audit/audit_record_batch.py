@@ -0,0 +1,108 @@
+import calendar
+import csv
+import json
+import sys
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from salto.audit.audit_record import AuditRecord
+from salto.message import Message
+
+EPOCH = datetime(1970, 1, 1)
+
+
+# Column oriented storage for large amounts of audit records, e.g. for analytics over historical trails. Every field is
+# decoded once while appending, repeated strings (doors, cards, users) are interned and datetimes are kept as epoch seconds
+# in the local time of the interface.
+#
+# batch = AuditRecordBatch.from_records(AuditTrail.fetch(client, "Room 214"))
+# batch.to_csv(sys.stdout)
+class AuditRecordBatch:
+    __slots__ = ("reference", "door_identifications", "timestamps", "incidents", "directions", "card_identifications",
+                 "copy_numbers", "users", "_timestamp_cache")
+
+    COLUMNS = ("door_identification", "datetime", "incident", "direction", "card_identification", "copy_number", "user")
+
+    # All records of a batch are placed in time relative to the same reference clock, see AuditRecord.parse_datetime
+    def __init__(self, reference: Optional[datetime] = None):
+        self.reference: datetime = reference or datetime.now()
+        self.door_identifications: List[str] = []
+        self.timestamps = array("q")
+        self.incidents = array("B")
+        self.directions = array("B")
+        self.card_identifications: List[str] = []
+        self.copy_numbers: List[str] = []
+        self.users: List[str] = []
+        self._timestamp_cache: Dict[bytes, int] = {}
+
+    @staticmethod
+    def from_records(audit_records: Iterable[AuditRecord], reference: Optional[datetime] = None) -> "AuditRecordBatch":
+        return AuditRecordBatch.from_messages((audit_record.message for audit_record in audit_records), reference)
+
+    @staticmethod
+    def from_messages(messages: Iterable[Message], reference: Optional[datetime] = None) -> "AuditRecordBatch":
+        batch = AuditRecordBatch(reference)
+        for message in messages:
+            batch.append(message)
+        return batch
+
+    # Appends an incidence, end of trail ('WO') and error ('WE') messages are skipped
+    def append(self, message: Message) -> None:
+        fields = message.fields
+        if len(fields) < 9:
+            return
+
+        self.door_identifications.append(sys.intern(fields[1].decode(Message.ENCODING)))
+        self.timestamps.append(self._timestamp(fields[2], fields[3]))
+        self.incidents.append(fields[4][0])
+        self.directions.append(AuditRecord.Direction.IN.value[0] if fields[5] == b"I" else AuditRecord.Direction.OUT.value[0])
+        self.card_identifications.append(sys.intern(fields[6].decode(Message.ENCODING).strip()))
+        self.copy_numbers.append(sys.intern(fields[7].decode(Message.ENCODING)))
+        self.users.append(sys.intern(fields[8].decode(Message.ENCODING)))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def datetime(self, index: int) -> datetime:
+        return EPOCH + timedelta(seconds=self.timestamps[index])
+
+    def incident(self, index: int) -> AuditRecord.Incident:
+        return AuditRecord.Incident(bytes([self.incidents[index]]))
+
+    def direction(self, index: int) -> AuditRecord.Direction:
+        return AuditRecord.Direction(bytes([self.directions[index]]))
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {
+            "door_identification": self.door_identifications[index],
+            "datetime": self.datetime(index).isoformat(),
+            "incident": self.incident(index).name,
+            "direction": self.direction(index).name,
+            "card_identification": self.card_identifications[index],
+            "copy_number": self.copy_numbers[index],
+            "user": self.users[index],
+        }
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        return (self.row(index) for index in range(len(self)))
+
+    def to_csv(self, file: TextIO) -> None:
+        writer = csv.DictWriter(file, fieldnames=AuditRecordBatch.COLUMNS)
+        writer.writeheader()
+        writer.writerows(self.rows())
+
+    def to_ndjson(self, file: TextIO) -> None:
+        for row in self.rows():
+            file.write(json.dumps(row))
+            file.write("\n")
+
+    # Trails repeat the same minutes over and over, each distinct date/time pair is parsed only once
+    def _timestamp(self, date_field: bytes, time_field: bytes) -> int:
+        key = date_field + b" " + time_field
+        timestamp = self._timestamp_cache.get(key)
+        if timestamp is None:
+            parsed_datetime = AuditRecord.parse_datetime(date_field.decode(Message.ENCODING), time_field.decode(Message.ENCODING), self.reference)
+            timestamp = calendar.timegm(parsed_datetime.timetuple())
+            self._timestamp_cache[key] = timestamp
+        return timestamp
@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+
+from salto.audit.audit_cursor import AuditCursor, CursorStore
+from salto.audit.audit_record import AuditRecord
+from salto.audit.audit_trail import AuditTrail
+from salto.client import Client
+from salto.message import Message
+
+
+# Local SQLite copy of audit trails. Overlapping fetches are deduplicated, so syncing a door repeatedly only adds the new
+# incidences, and investigations run against the database instead of the interface.
+#
+# store = AuditStore("audit.sqlite3")
+# store.sync(client, "Room 214")
+# records = store.query(door_identification="Room 214", since=datetime(2026, 3, 1, 2), until=datetime(2026, 3, 1, 4))
+class AuditStore(CursorStore):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS audit_records (
+            door_identification TEXT NOT NULL,
+            datetime TEXT NOT NULL,
+            incident TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            card_identification TEXT NOT NULL,
+            copy_number TEXT NOT NULL,
+            user TEXT NOT NULL,
+            UNIQUE (door_identification, datetime, card_identification, copy_number, incident, direction, user)
+        );
+        CREATE INDEX IF NOT EXISTS audit_records_door ON audit_records (door_identification, datetime);
+        CREATE INDEX IF NOT EXISTS audit_records_card ON audit_records (card_identification, datetime);
+        CREATE INDEX IF NOT EXISTS audit_records_datetime ON audit_records (datetime);
+        CREATE INDEX IF NOT EXISTS audit_records_incident ON audit_records (incident, datetime);
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(AuditStore.SCHEMA)
+
+    # Stores the incidences, skipping end of trail and error records as well as ones already stored. Returns the number added.
+    def add(self, audit_records: Iterable[AuditRecord]) -> int:
+        rows = [
+            (
+                audit_record.door_identification,
+                audit_record.datetime.isoformat(),
+                audit_record.incident.value.decode(Message.ENCODING),
+                audit_record.message.str_field(5),
+                audit_record.card_identification,
+                audit_record.copy_number,
+                audit_record.user,
+            )
+            for audit_record in audit_records
+            if not audit_record.is_error and not audit_record.is_end_of_trail
+        ]
+
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO audit_records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            return self._db.total_changes - before
+
+    # Fetches the incidences of a door which are newer than the ones stored. Returns the number added.
+    def sync(self, client: Client, door_identification: str) -> int:
+        return self.add(AuditTrail.iterate(client, door_identification, self))
+
+    def query(self,
+              door_identification: Optional[str] = None,
+              card_identification: Optional[str] = None,
+              since: Optional[datetime] = None,
+              until: Optional[datetime] = None,
+              incident: Optional[AuditRecord.Incident] = None,
+              limit: Optional[int] = None) -> List[AuditRecord]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        if door_identification is not None:
+            conditions.append("door_identification = ?")
+            parameters.append(door_identification)
+        if card_identification is not None:
+            conditions.append("card_identification = ?")
+            parameters.append(card_identification)
+        if since is not None:
+            conditions.append("datetime >= ?")
+            parameters.append(since.isoformat())
+        if until is not None:
+            conditions.append("datetime <= ?")
+            parameters.append(until.isoformat())
+        if incident is not None:
+            conditions.append("incident = ?")
+            parameters.append(incident.value.decode(Message.ENCODING))
+
+        sql = "SELECT * FROM audit_records"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY datetime"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, parameters).fetchall()
+        return [AuditStore._to_audit_record(*row) for row in rows]
+
+    # The newest stored incidence of the door is where a sync resumes
+    def load(self, door_identification: str) -> AuditCursor:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT datetime, card_identification FROM audit_records WHERE door_identification = ? ORDER BY datetime DESC LIMIT 1",
+                (door_identification,),
+            ).fetchone()
+
+        if row is None:
+            return AuditCursor(door_identification)
+        return AuditCursor(door_identification, datetime.fromisoformat(row[0]), row[1])
+
+    # The cursor follows from the stored incidences, there is nothing else to persist
+    def save(self, cursor: AuditCursor) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "AuditStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def _to_audit_record(door_identification: str, stored_datetime: str, incident: str, direction: str, card_identification: str, copy_number: str, user: str) -> AuditRecord:
+        parsed_datetime = datetime.fromisoformat(stored_datetime)
+        date_field, _, time_field = parsed_datetime.strftime(AuditRecord.DATETIME_FORMAT).partition(" ")
+        fields = [b"WN", door_identification, date_field, time_field, incident, direction, card_identification, copy_number, user]
+
+        audit_record = AuditRecord(Message([Message.encode_str(field) if isinstance(field, str) else field for field in fields]))
+        audit_record._datetime = parsed_datetime  # the stored datetime already carries the year
+        return audit_record
@@ -1,5 +1,7 @@
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional
 
+from salto.async_client import AsyncClient
+from salto.audit.audit_cursor import AuditCursor, CursorStore
 from salto.audit.audit_record import AuditRecord
 from salto.client import Client
 from salto.message import Message
@@ -9,18 +11,95 @@ class AuditTrail:
     # Fetches the audit trail for a given door. Audit retention is based on configuration in Salto.
     @staticmethod
     def fetch(client: Client, door_identification: str) -> List[AuditRecord]:
-        audit_records: List[AuditRecord] = []
-        end_of_trail = False
+        return list(AuditTrail.iterate(client, door_identification))
 
-        with client.create_connection() as conn:
-            next_message = Message([b"WF", Message.encode_str(door_identification)])
-            while not end_of_trail:
-                response = client._send_request(conn, client.encode_message(next_message))
+    # Same as fetch, driven by an AsyncClient so many doors can be polled from a single event loop
+    @staticmethod
+    async def fetch_async(client: AsyncClient, door_identification: str) -> List[AuditRecord]:
+        return [audit_record async for audit_record in AuditTrail.iterate_async(client, door_identification)]
+
+    # Yields the audit records as they arrive, the last one being the end of trail ('WO') or error ('WE') record.
+    # With a cursor store the walk resumes after the last record seen by a previous poller for the door. A record counts
+    # as seen once the next one is asked for, a record whose processing raised is delivered again by the next walk.
+    #
+    # for audit_record in AuditTrail.iterate(client, "Room 214", AuditCursorStore("/var/lib/salto/cursors.json")):
+    #     ...
+    @staticmethod
+    def iterate(client: Client, door_identification: str, cursor_store: Optional[CursorStore] = None) -> Iterator[AuditRecord]:
+        walk = AuditWalk(door_identification, cursor_store)
+        try:
+            with client.connection() as conn:
+                while not walk.is_finished:
+                    response = client._send_on(conn, client.encode_message(walk.next_message()))
+
+                    audit_record = response.audit_record
+                    if walk.accept(audit_record):
+                        yield audit_record
+                        walk.commit()
+        finally:
+            walk.save()
+
+    @staticmethod
+    async def iterate_async(client: AsyncClient, door_identification: str, cursor_store: Optional[CursorStore] = None) -> AsyncIterator[AuditRecord]:
+        walk = AuditWalk(door_identification, cursor_store)
+        try:
+            async with client.connection() as conn:
+                while not walk.is_finished:
+                    response = await client._send_request(conn, client.encode_message(walk.next_message()))
+
+                    audit_record = response.audit_record
+                    if walk.accept(audit_record):
+                        yield audit_record
+                        walk.commit()
+        finally:
+            walk.save()
+
+
+# IO-free state of a single audit trail walk, shared by the sync and async iterators.
+#
+# A fresh walk starts with 'WF' and continues with 'WN'. A resumed walk first asks the interface to repeat ('WR') the last
+# incidence it sent, which the previous poller may not have processed, and continues with 'WN'. When the interface has
+# nothing to repeat (e.g. it was restarted) the walk falls back to 'WF'. Records the cursor has seen already are skipped.
+# The cursor only advances past a record on commit(), once the caller is done with it.
+class AuditWalk:
+    def __init__(self, door_identification: str, cursor_store: Optional[CursorStore] = None):
+        self.door_identification = door_identification
+        self.cursor_store = cursor_store
+        self.cursor: AuditCursor = cursor_store.load(door_identification) if cursor_store else AuditCursor(door_identification)
+        # Records are only skipped relative to where the walk resumed, the order of the trail itself is up to the interface
+        self.resumed_from = AuditCursor.from_dict(self.cursor.to_dict())
+        self.command: bytes = b"WR" if self.cursor.is_started else b"WF"
+        self.is_finished = False
+        self.pending: Optional[AuditRecord] = None  # handed to the caller, not committed to the cursor yet
+
+    def next_message(self) -> Message:
+        return Message([self.command, Message.encode_str(self.door_identification)])
+
+    # Returns whether the record should be handed to the caller
+    def accept(self, audit_record: AuditRecord) -> bool:
+        command, self.command = self.command, b"WN"
+
+        if command == b"WR" and audit_record.is_end_of_trail:
+            self.command = b"WF"
+            return False
+
+        if audit_record.is_error or audit_record.is_end_of_trail:
+            self.is_finished = True
+            return True
+
+        if self.resumed_from.has_seen(audit_record):
+            return False
 
-                audit_record = AuditRecord(response.message)
-                audit_records.append(audit_record)
+        if not self.cursor.has_seen(audit_record):
+            self.pending = audit_record
+        return True
 
-                next_message = Message([b"WN", Message.encode_str(door_identification)])
-                end_of_trail = audit_record.is_error or audit_record.is_end_of_trail
+    # Advances the cursor past the record handed to the caller last
+    def commit(self) -> None:
+        if self.pending is not None:
+            self.cursor.advance(self.pending)
+            self.pending = None
 
-        return audit_records
+    def save(self) -> None:
+        if self.cursor_store is not None and self.cursor.is_started:
+            self.cursor_store.save(self.cursor)
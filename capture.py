@@ -0,0 +1,139 @@
+import struct
+import threading
+import weakref
+from time import time
+from typing import Any, BinaryIO, Iterator, NamedTuple, Union
+
+from salto import common
+from salto.message import Message
+
+
+# Binary capture of the frames sent and received by clients, compact enough to leave enabled in production.
+#
+# File layout: the MAGIC header, followed by one record per frame: a RECORD header (timestamp, connection number,
+# direction, length) and the raw frame bytes. Every opening of the capture starts a new session with an empty SESSION
+# record, connection numbers restart with each session.
+#
+# capture = WireCapture("/var/log/salto/wire.cap")
+# client = Client("192.168.1.120:8090", capture=capture)
+# ...
+# python -m salto.capture /var/log/salto/wire.cap
+class WireCapture:
+    MAGIC = b"SALTOCAP\x01"
+    RECORD = struct.Struct("<dIBI")  # unix timestamp, connection number, direction, frame length
+    OUT = 0
+    IN = 1
+    SESSION = 2  # direction of the marker starting a session
+
+    class Record(NamedTuple):
+        timestamp: float
+        connection: int
+        direction: int
+        frame: bytes
+        session: int = 0  # sessions are numbered from 1, 0 for records written before session markers existed
+
+    class InvalidCapture(Exception):
+        pass
+
+    def __init__(self, file: Union[str, BinaryIO]):
+        self._owns_file = isinstance(file, str)
+        self._file: BinaryIO = open(file, "ab") if isinstance(file, str) else file
+        if self._file.tell() == 0:
+            self._file.write(WireCapture.MAGIC)
+        self._file.write(WireCapture.RECORD.pack(time(), 0, WireCapture.SESSION, 0))
+        self._lock = threading.Lock()
+        self._connections: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+        self._last_connection = 0
+
+    # Connections are numbered in order of appearance, a number is never reused within a session
+    def write(self, connection: Any, direction: str, frame: bytes) -> None:
+        with self._lock:
+            number = self._connections.get(connection)
+            if number is None:
+                self._last_connection += 1
+                number = self._connections[connection] = self._last_connection
+
+            direction_code = WireCapture.OUT if direction == "out" else WireCapture.IN
+            self._file.write(WireCapture.RECORD.pack(time(), number, direction_code, len(frame)))
+            self._file.write(frame)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+
+    def __enter__(self) -> "WireCapture":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def read(file: Union[str, BinaryIO]) -> Iterator["WireCapture.Record"]:
+        if isinstance(file, str):
+            with open(file, "rb") as capture_file:
+                yield from WireCapture.read(capture_file)
+            return
+
+        if file.read(len(WireCapture.MAGIC)) != WireCapture.MAGIC:
+            raise WireCapture.InvalidCapture("Not a SALTO wire capture")
+
+        session = 0
+        while True:
+            header = file.read(WireCapture.RECORD.size)
+            if len(header) < WireCapture.RECORD.size:
+                return  # a capture cut off while writing ends with a partial record
+            timestamp, connection, direction, length = WireCapture.RECORD.unpack(header)
+            frame = file.read(length)
+            if len(frame) < length:
+                return
+            if direction == WireCapture.SESSION:
+                session += 1
+                continue
+            yield WireCapture.Record(timestamp, connection, direction, frame, session)
+
+
+# Human readable form of the frames, as used in the debug log
+def format_frame(frame: bytes) -> str:
+    frame = frame.replace(common.STX, b"STX ")
+    frame = frame.replace(common.ETX, b" ETX")
+    frame = frame.replace(common.ENQ, b"ENQ")
+    frame = frame.replace(common.ACK, b"ACK")
+    frame = frame.replace(common.NAK, b"NAK")
+    frame = frame.replace(common.LRC_SKIP, b"LRC_SKIP")
+    frame = frame.replace(Message.FIELD_DELIMITER, b"|")
+    return repr(frame)
+
+
+def format_record(record: WireCapture.Record) -> str:
+    from datetime import datetime
+
+    timestamp = datetime.fromtimestamp(record.timestamp).isoformat(timespec="microseconds")
+    arrow = "->" if record.direction == WireCapture.OUT else "<-"
+    return f"{timestamp} #{record.session}.{record.connection} {arrow} {format_frame(record.frame)}"
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pretty-print a SALTO wire capture")
+    parser.add_argument("capture")
+    parser.add_argument("--session", type=int, help="only show the frames of this session number")
+    parser.add_argument("--connection", type=int, help="only show the frames of this connection number")
+    arguments = parser.parse_args()
+
+    for record in WireCapture.read(arguments.capture):
+        if arguments.session is not None and record.session != arguments.session:
+            continue
+        if arguments.connection is None or record.connection == arguments.connection:
+            print(format_record(record))
+
+
+if __name__ == "__main__":
+    main()
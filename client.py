@@ -1,120 +1,364 @@
-import io
 import socket
-from logging import Logger
-from time import sleep
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from salto import common
+from salto.capture import WireCapture, format_frame
+from salto.deadline import CancellationToken, Deadline
+from salto.instrumentation import Instrumentation, command_name
 from salto.message import Message
+from salto.pool import ConnectionPool
+from salto.protocol import FrameParser
+from salto.resilience import Backoff, CircuitBreaker
 from salto.response import Response
 
+if TYPE_CHECKING:
+    from logging import Logger  # logging is slow to import, it is left to the callers passing a logger
+
 
 class Client:
     MAX_RETRIES = 3
 
     CONNECT_TIMEOUT = 10  # seconds to connect the server
     WRITE_TIMEOUT = 10  # seconds to write a request
-    READ_TIMEOUT = 30  # seconds to read some bytes. Must including waiting time to place the card
+    READ_TIMEOUT = 30  # seconds to read a response. Must including waiting time to place the card
+    RECEIVE_SIZE = 4096  # bytes requested per recv call
+    DEBUG = 10  # logging.DEBUG
+    UNIX_PREFIX = "unix:"  # endpoints of local Unix sockets, e.g. a gateway: "unix:/run/salto/gateway.sock"
 
     class InvalidAcknowledgement(Exception):
         pass
 
     # client = Client("192.168.1.120:8090")
-    def __init__(self, endpoint: str, logger: Optional[Logger] = None, lrc_skip: bool = False):
-        host, _, port = endpoint.partition(":")
+    # pooled_client = Client("192.168.1.120:8090", pool=ConnectionPool(max_size=2))
+    # gateway_client = Client("unix:/run/salto/gateway.sock")
+    def __init__(self,
+                 endpoint: str,
+                 logger: Optional["Logger"] = None,
+                 lrc_skip: bool = False,
+                 pool: Optional[ConnectionPool] = None,
+                 capture: Optional[WireCapture] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 backoff: Optional[Backoff] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.unix_path: Optional[str] = None
+        if endpoint.startswith(Client.UNIX_PREFIX):
+            self.unix_path = endpoint[len(Client.UNIX_PREFIX):]
+            host, port = self.unix_path, "0"
+        else:
+            host, _, port = endpoint.partition(":")
         self.host: str = host
         self.port: int = int(port)
         self.logger = logger
         self.lrc_skip = lrc_skip
+        self.pool = pool
+        self.capture = capture
+        self.instrumentation: Instrumentation = instrumentation or Instrumentation()
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker
 
     @property
     def is_ready(self) -> bool:
         return self.send_request(common.ENQ).is_ack
 
-    def create_connection(self) -> socket.socket:
-        return socket.create_connection((self.host, self.port), Client.CONNECT_TIMEOUT)
+    def create_connection(self, timeout: float = CONNECT_TIMEOUT) -> socket.socket:
+        started = monotonic()
+        if self.unix_path is None:
+            conn = socket.create_connection((self.host, self.port), timeout)
+        else:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conn.settimeout(timeout)
+                conn.connect(self.unix_path)
+            except BaseException:
+                conn.close()
+                raise
+        self.instrumentation.span("connect", monotonic() - started)
+        return conn
+
+    # Borrows a live socket from the pool when pooling is enabled, otherwise opens a new one for the duration of the block
+    @contextmanager
+    def connection(self, deadline: Optional[Deadline] = None) -> Iterator[socket.socket]:
+        if self.pool is None:
+            timeout = Client.CONNECT_TIMEOUT if deadline is None else deadline.timeout(Client.CONNECT_TIMEOUT)
+            with self.create_connection(timeout) as conn:
+                yield conn
+        else:
+            with self.pool.connection(self, deadline) as conn:
+                yield conn
+
+    @property
+    def endpoint(self) -> str:
+        return f"{Client.UNIX_PREFIX}{self.unix_path}" if self.unix_path is not None else f"{self.host}:{self.port}"
+
+    # A deadline bounds the whole request, its token can cancel it from another thread:
+    # client.send_message(ReadCard(encoder="Online Encoder 1"), deadline=Deadline(60, token))
+    def send_request(self, request: bytes, encoder: Optional[str] = None, deadline: Optional[Deadline] = None) -> Response:
+        if self.breaker is not None:
+            return self._send_guarded(request, encoder, deadline)
+
+        return self._send_connected(request, deadline)
+
+    def send_message(self, message: Message, deadline: Optional[Deadline] = None) -> Response:
+        return self.send_request(self.encode_message(message), message.encoder, deadline)
 
-    def send_request(self, request: bytes) -> Response:
-        with self.create_connection() as conn:
-            return self._send_request(conn, request)
+    def _send_connected(self, request: bytes, deadline: Optional[Deadline]) -> Response:
+        if deadline is None:
+            with self.connection() as conn:
+                return self._send_request(conn, request)
 
-    def send_message(self, message: Message) -> Response:
-        return self.send_request(self.encode_message(message))
+        with self.connection(deadline) as conn, deadline.guard(conn):
+            return self._send_request(conn, request, deadline=deadline)
+
+    # Sends the messages one after the other over a single connection per worker and returns their responses in order.
+    # A failing message does not abort the batch: its exception takes the place of the response and the worker reconnects.
+    #
+    # results = client.send_many(Checkout(room=room) for room in rooms)
+    # failed = [result for result in results if isinstance(result, Exception)]
+    def send_many(self, messages: Iterable[Message], concurrency: int = 1) -> List[Union[Response, Exception]]:
+        items = enumerate(messages)
+        lock = threading.Lock()
+        results: Dict[int, Union[Response, Exception]] = {}
+
+        if concurrency <= 1:
+            self._send_batch(items, lock, results)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="salto-batch") as executor:
+                for worker in [executor.submit(self._send_batch, items, lock, results) for _ in range(concurrency)]:
+                    worker.result()
+
+        return [results[index] for index in range(len(results))]
 
     def encode_message(self, message: Message) -> bytes:
-        message_bytes = bytes(message)
-        lrc = common.LRC_SKIP if self.lrc_skip else common.lrc(message_bytes)
-        return common.STX + message_bytes + common.ETX + lrc
+        return message.frame(self.lrc_skip)
+
+    def _send_batch(self, items: Iterator[Tuple[int, Message]], lock: threading.Lock, results: Dict[int, Union[Response, Exception]]) -> None:
+        while True:
+            with lock:
+                item = next(items, None)
+            if item is None:
+                return
+
+            index = item[0]
+            try:
+                with self.connection() as conn:
+                    while item is not None:
+                        index, message = item
+                        try:
+                            results[index] = self._send_on(conn, self.encode_message(message), message.encoder)
+                        except CircuitBreaker.Open as error:
+                            results[index] = error  # nothing was sent, the socket is fine
+                        with lock:
+                            item = next(items, None)
+                    return
+            except Exception as error:
+                # Leaving the connection block drops the socket, the next message starts on a fresh one
+                results[index] = error
+
+    def _send_guarded(self, request: bytes, encoder: Optional[str], deadline: Optional[Deadline] = None) -> Response:
+        return self._guard(request, encoder, lambda guarded_request: self._send_connected(guarded_request, deadline))
 
-    def _send_request(self, conn: socket.socket, request: bytes, attempt: int = 1) -> Response:
-        self._debug("out", request)
-        conn.settimeout(Client.WRITE_TIMEOUT)
-        conn.sendall(request)
+    # Sends the request over a socket the caller holds across requests (batches, audit trail walks, ...), through the
+    # circuit breaker like send_request
+    def _send_on(self, conn: socket.socket, request: bytes, encoder: Optional[str] = None, deadline: Optional[Deadline] = None) -> Response:
+        if self.breaker is None:
+            return self._send_request(conn, request, deadline=deadline)
 
-        conn.settimeout(Client.READ_TIMEOUT)
-        acknowledgement = conn.recv(1)
-        self._debug("in", acknowledgement)
+        return self._guard(request, encoder, lambda guarded_request: self._send_request(conn, guarded_request, deadline=deadline))
+
+    # Sends the request through the circuit breaker: the endpoint and the encoder circuits must be closed, or the request is
+    # the probe of a recovering circuit. An endpoint is probed with a single ENQ before the request itself is sent.
+    def _guard(self, request: bytes, encoder: Optional[str], send: Callable[[bytes], Response]) -> Response:
+        breaker: CircuitBreaker = self.breaker  # type: ignore[assignment]
+        endpoint_key = self.endpoint
+        encoder_key = None if encoder is None else f"{endpoint_key}/{encoder}"
+
+        encoder_probe = encoder_key is not None and breaker.acquire(encoder_key)
+        try:
+            probe = breaker.acquire(endpoint_key)
+        except CircuitBreaker.Open:
+            if encoder_probe:
+                breaker.release(encoder_key)  # type: ignore[arg-type]
+            raise
+
+        try:
+            try:
+                if probe and request != common.ENQ and not send(common.ENQ).is_ack:
+                    response = Response(common.NAK)
+                else:
+                    response = send(request)
+            except (Deadline.Exceeded, CancellationToken.Cancelled):
+                if probe:
+                    breaker.release(endpoint_key)
+                raise  # the caller gave up, that says nothing about the interface
+            except Exception:
+                breaker.failure(endpoint_key)
+                raise
+
+            if response.is_nak:
+                breaker.failure(endpoint_key)
+                return response
+
+            breaker.success(endpoint_key)
+            if encoder_key is not None:
+                if response.is_message and response.message.error_code in CircuitBreaker.FAILURE_ERRORS:
+                    breaker.failure(encoder_key)
+                else:
+                    breaker.success(encoder_key)
+                encoder_probe = False
+            return response
+        finally:
+            # The encoder was not reached, its probe is handed back for the next request
+            if encoder_probe:
+                breaker.release(encoder_key)  # type: ignore[arg-type]
+
+    def _send_request(self,
+                      conn: socket.socket,
+                      request: bytes,
+                      attempt: int = 1,
+                      parser: Optional[FrameParser] = None,
+                      deadline: Optional[Deadline] = None) -> Response:
+        # The parser lives for the whole request, the ACK and the message frame may arrive in a single chunk
+        parser = parser or FrameParser()
+        instrumentation = self.instrumentation
+        command = command_name(request)
+        started = monotonic()
+        if attempt == 1:
+            instrumentation.count("requests", command)
+
+        self._trace(conn, "out", request)
+        self._write(conn, request, deadline)
+        instrumentation.count("bytes_out", command, len(request))
+
+        acknowledgement = self.receive_frame(conn, parser, deadline)
+        self._trace(conn, "in", acknowledgement)
+        instrumentation.count("bytes_in", command, len(acknowledgement))
+        instrumentation.span("ack", monotonic() - started, command)
 
         if request == common.ENQ and acknowledgement in [common.ACK, common.NAK]:
-            return Response(acknowledgement)
+            response = Response(acknowledgement)
         elif acknowledgement == common.ACK:
-            return self.read_stx(conn)
+            instrumentation.count("ack", command)
+            response = self.read_stx(conn, parser, command, deadline)
         elif acknowledgement == common.NAK:
+            instrumentation.count("nak", command)
             if attempt < Client.MAX_RETRIES:
-                self.await_ready(conn)
-                return self._send_request(conn, request, attempt + 1)
+                instrumentation.count("retry", command)
+                waiting = monotonic()
+                self.await_ready(conn, parser, deadline)
+                instrumentation.span("retry", monotonic() - waiting, command)
+                response = self._send_request(conn, request, attempt + 1, parser, deadline)
             else:
-                return Response(acknowledgement)
+                response = Response(acknowledgement)
         else:
             raise Client.InvalidAcknowledgement(f"Invalid SALTO acknowledgement: {acknowledgement!r}")
 
-    def read_stx(self, conn: socket.socket) -> Response:
-        with io.BytesIO() as buffer:
-            while True:
-                conn.settimeout(Client.READ_TIMEOUT)
-                current_control_char = conn.recv(1)
-                buffer.write(current_control_char)
+        if attempt == 1:
+            instrumentation.span("total", monotonic() - started, command)
+        return response
+
+    def read_stx(self,
+                 conn: socket.socket,
+                 parser: Optional[FrameParser] = None,
+                 command: Optional[str] = None,
+                 deadline: Optional[Deadline] = None) -> Response:
+        started = monotonic()
+        response, first_byte_at = self._receive_frame(conn, parser or FrameParser(), deadline)
+        self._trace(conn, "in", response)
 
-                # Read until ETX
-                if current_control_char == common.ETX:
-                    break
+        instrumentation = self.instrumentation
+        instrumentation.span("card_wait", first_byte_at - started, command)
+        instrumentation.span("read", monotonic() - first_byte_at, command)
+        instrumentation.count("bytes_in", command, len(response))
+        if not response:
+            # The ACK promised a response, the interface hung up instead
+            raise ConnectionResetError("SALTO interface closed the connection before responding")
 
-            # Read the LCR char
-            conn.settimeout(Client.READ_TIMEOUT)
-            buffer.write(conn.recv(1))
+        try:
+            result = Response(response)
+        except Response.InvalidMessage:
+            instrumentation.count("lrc_failure", command)
+            raise
 
-            response = buffer.getvalue()
-            self._debug("in", response)
+        if result.is_message and result.message.is_error:
+            instrumentation.count(f"error.{result.message.error_code}", command)
+        return result
 
-            return Response(response)
+    # Reads chunks until the parser yields a complete frame, READ_TIMEOUT applies to the frame as a whole (capped by the
+    # deadline of the request, if any). Returns the incomplete remainder (possibly empty) when the server closes the connection.
+    def receive_frame(self, conn: socket.socket, parser: FrameParser, deadline: Optional[Deadline] = None) -> bytes:
+        return self._receive_frame(conn, parser, deadline)[0]
 
-    def await_ready(self, conn: socket.socket) -> None:
+    # Also returns the monotonic time the first chunk of the frame arrived at
+    def _receive_frame(self, conn: socket.socket, parser: FrameParser, deadline: Optional[Deadline] = None) -> Tuple[bytes, float]:
+        read_until = monotonic() + Client.READ_TIMEOUT
+        first_byte_at = monotonic() if parser.has_frame else 0.0
+        while not parser.has_frame:
+            remaining = read_until - monotonic()
+            if remaining <= 0:
+                raise socket.timeout("Timed out reading SALTO response")
+
+            if deadline is None:
+                conn.settimeout(remaining)
+                chunk = conn.recv(Client.RECEIVE_SIZE)
+            else:
+                try:
+                    conn.settimeout(deadline.timeout(remaining))
+                    chunk = conn.recv(Client.RECEIVE_SIZE)
+                except OSError:
+                    deadline.check()  # report the deadline or cancellation rather than the timeout it caused
+                    raise
+                if not chunk:
+                    deadline.check()  # a cancelled request has its socket shut down, which reads as end of stream
+
+            if not first_byte_at:
+                first_byte_at = monotonic()
+            if not chunk:
+                return parser.flush(), first_byte_at
+            parser.feed(chunk)
+
+        return parser.next_frame(), first_byte_at
+
+    def await_ready(self, conn: socket.socket, parser: Optional[FrameParser] = None, deadline: Optional[Deadline] = None) -> None:
+        parser = parser or FrameParser()
         attempt = 1
         while True:
-            self._debug("out", common.ENQ)
-            conn.settimeout(Client.WRITE_TIMEOUT)
-            conn.sendall(common.ENQ)
+            self._trace(conn, "out", common.ENQ)
+            self._write(conn, common.ENQ, deadline)
 
-            conn.settimeout(Client.READ_TIMEOUT)
-            acknowledgement = conn.recv(1)
-            self._debug("in", acknowledgement)
+            acknowledgement = self.receive_frame(conn, parser, deadline)
+            self._trace(conn, "in", acknowledgement)
 
             if acknowledgement == common.ACK or attempt >= Client.MAX_RETRIES:
                 break
 
+            if deadline is None:
+                sleep(self.backoff.delay(attempt))
+            else:
+                deadline.sleep(self.backoff.delay(attempt))
             attempt += 1
-            sleep(0.2)
 
-    def _debug(self, direction: str, message: bytes) -> None:
-        if self.logger is None:
+    def _write(self, conn: socket.socket, data: bytes, deadline: Optional[Deadline] = None) -> None:
+        if deadline is None:
+            conn.settimeout(Client.WRITE_TIMEOUT)
+            conn.sendall(data)
             return
 
-        message = message.replace(common.STX, b"STX ")
-        message = message.replace(common.ETX, b" ETX")
-        message = message.replace(common.ENQ, b"ENQ")
-        message = message.replace(common.ACK, b"ACK")
-        message = message.replace(common.NAK, b"NAK")
-        message = message.replace(common.LRC_SKIP, b"LRC_SKIP")
-        message = message.replace(Message.FIELD_DELIMITER, b"|")
+        try:
+            conn.settimeout(deadline.timeout(Client.WRITE_TIMEOUT))
+            conn.sendall(data)
+        except OSError:
+            deadline.check()
+            raise
+
+    def _trace(self, conn: Any, direction: str, frame: bytes) -> None:
+        if self.capture is not None:
+            self.capture.write(conn, direction, frame)
 
-        self.logger.debug(f"[SALTO][{self.host}:{self.port}] {'->' if direction == 'out' else '<-'} {message!r}")
+        # The level is checked before any formatting, so a logger which is not at DEBUG costs nothing
+        if self.logger is not None and self.logger.isEnabledFor(Client.DEBUG):
+            self.logger.debug(f"[SALTO][{self.endpoint}] {'->' if direction == 'out' else '<-'} {format_frame(frame)}")
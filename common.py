@@ -6,9 +6,26 @@ NAK: bytes = b"\x15"  # Negative acknowledgement to a PMS message or enquiry (EN
 
 LRC_SKIP: bytes = b"\x0D"  # The PMS can avoid LRC calculation by sending a 0DH value (return character)
 
+LRC_FOLD_SIZE: int = 64  # from this many bytes on XOR-ing a big integer beats a Python loop
 
+
+# Accepts any bytes-like object, e.g. a memoryview slice of a received frame
 def lrc(message: bytes) -> bytes:
+    return bytes([xor(message) ^ ETX[0]])  # LRC message must not include STX and should include ETX
+
+
+# XOR of all bytes. Since XOR is associative, the LRC of a message can be combined from the XORs of its parts.
+def xor(data: bytes) -> int:
     result = 0
-    for b in message + ETX:  # LRC message must not include STX and should include ETX
-        result ^= b
-    return bytes([result])
+    if len(data) < LRC_FOLD_SIZE:
+        for b in data:
+            result ^= b
+        return result
+
+    # XOR all bytes at once: fold the halves of the data, read as one integer, onto each other until a byte remains
+    result = int.from_bytes(data, "little")
+    width = len(data)
+    while width > 1:
+        width = (width + 1) // 2
+        result = (result >> (width * 8)) ^ (result & ((1 << (width * 8)) - 1))
+    return result
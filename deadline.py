@@ -0,0 +1,112 @@
+import socket
+import threading
+from contextlib import contextmanager
+from time import monotonic, sleep
+from typing import Callable, Iterator, List, Optional
+
+
+# Lets another thread abort requests, e.g. a ReadCard waiting on a card when the clerk walked away. Cancelling shuts down
+# the sockets of the requests using the token, which ends their wait right away.
+#
+# token = CancellationToken()
+# client.send_message(ReadCard(encoder="Online Encoder 1"), deadline=Deadline(60, token))  # on a worker thread
+# token.cancel()  # on any other thread
+class CancellationToken:
+    class Cancelled(Exception):
+        pass
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise CancellationToken.Cancelled("SALTO request was cancelled")
+
+    # Sleeps, returns early (True) once cancelled
+    def wait(self, seconds: float) -> bool:
+        return self._event.wait(seconds)
+
+    # Calls the callback when the token gets cancelled, right away when it was already. Returns a function unregistering it.
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+# Time budget of a whole request: connecting, waiting for the ACK, NAK retries and reading the response all draw from the
+# same budget. The fixed Client timeouts still cap the individual steps. Optionally carries a cancellation token.
+#
+# client.send_message(EncodeCard(amount=1, encoder="Online Encoder 1", rooms=["Room 1"]), deadline=Deadline(45))
+class Deadline:
+    class Exceeded(socket.timeout):
+        pass
+
+    def __init__(self, seconds: Optional[float] = None, token: Optional[CancellationToken] = None):
+        self.expires_at: Optional[float] = None if seconds is None else monotonic() + seconds
+        self.token = token
+
+    # Seconds left, None without a time limit
+    @property
+    def remaining(self) -> Optional[float]:
+        return None if self.expires_at is None else self.expires_at - monotonic()
+
+    def check(self) -> None:
+        if self.token is not None:
+            self.token.raise_if_cancelled()
+        if self.expires_at is not None and monotonic() >= self.expires_at:
+            raise Deadline.Exceeded("SALTO request deadline exceeded")
+
+    # Timeout for a single step: the step's own limit, or what is left of the budget if that is less
+    def timeout(self, limit: float) -> float:
+        self.check()
+        remaining = self.remaining
+        return limit if remaining is None else min(limit, remaining)
+
+    def sleep(self, seconds: float) -> None:
+        seconds = self.timeout(seconds)
+        if self.token is not None:
+            self.token.wait(seconds)
+        else:
+            sleep(seconds)
+        self.check()
+
+    # Shuts the socket down when the token is cancelled while the block runs, so a blocking send or receive returns
+    @contextmanager
+    def guard(self, conn: socket.socket) -> Iterator[None]:
+        if self.token is None:
+            yield
+            return
+
+        unregister = self.token.register(lambda: _shutdown(conn))
+        try:
+            yield
+        finally:
+            unregister()
+
+
+def _shutdown(conn: socket.socket) -> None:
+    try:
+        conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # closed already
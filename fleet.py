@@ -0,0 +1,181 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import monotonic
+from typing import Dict, Iterable, Mapping, Optional, Union
+
+from salto.client import Client
+from salto.message import Message
+from salto.pool import ConnectionPool
+from salto.response import Response
+
+
+# Clients for the Salto interfaces of many properties, with their readiness cached. Readiness is checked concurrently with
+# an ENQ and kept fresh by background heartbeats, so reading it never waits on the network. A slow interface only delays
+# its own check: a property is not checked again while its previous check is still running. Requests are routed by property.
+#
+# with Fleet({"amsterdam": "10.1.0.20:8090", "berlin": "10.2.0.20:8090"}, pool=ConnectionPool()) as fleet:
+#     fleet.health()  # {"amsterdam": Fleet.Status(ready=True, ...), ...}
+#     fleet.send_message("berlin", Checkout(room="Room 214"))
+class Fleet:
+    TTL = 30.0  # seconds a readiness check is trusted
+    HEARTBEAT_INTERVAL = 10.0  # seconds between two background sweeps
+    MAX_WORKERS = 16  # concurrent readiness checks
+
+    class UnknownProperty(KeyError):
+        pass
+
+    class Status:
+        def __init__(self, ready: bool, checked_at: float, latency: Optional[float] = None, error: Optional[str] = None):
+            self.ready = ready
+            self.checked_at = checked_at  # monotonic time of the check
+            self.latency = latency  # seconds the ENQ round trip took
+            self.error = error  # why the interface could not be reached
+
+        @property
+        def age(self) -> float:
+            return monotonic() - self.checked_at
+
+        def __repr__(self) -> str:
+            return f"Fleet.Status(ready={self.ready}, age={self.age:.1f}s, latency={self.latency}, error={self.error!r})"
+
+    def __init__(self,
+                 endpoints: Mapping[str, Union[str, Client]],
+                 ttl: float = TTL,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL,
+                 max_workers: int = MAX_WORKERS,
+                 pool: Optional[ConnectionPool] = None):  # shared by the clients created from endpoint strings
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Client] = {}
+        self._statuses: Dict[str, Fleet.Status] = {}
+        self._checks: Dict[str, "Future[Fleet.Status]"] = {}  # checks in flight
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="salto-fleet")
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+        for key, endpoint in endpoints.items():
+            self.add(key, endpoint)
+
+    def add(self, key: str, endpoint: Union[str, Client]) -> Client:
+        client = endpoint if isinstance(endpoint, Client) else Client(endpoint, pool=self.pool)
+        with self._lock:
+            self._clients[key] = client
+            self._statuses.pop(key, None)
+        return client
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._clients.pop(key, None)
+            self._statuses.pop(key, None)
+
+    @property
+    def keys(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._clients)
+
+    def client(self, key: str) -> Client:
+        with self._lock:
+            try:
+                return self._clients[key]
+            except KeyError:
+                raise Fleet.UnknownProperty(key) from None
+
+    def send_message(self, key: str, message: Message) -> Response:
+        client = self.client(key)
+        try:
+            response = client.send_message(message)
+        except OSError as error:
+            self._set_status(key, Fleet.Status(False, monotonic(), error=str(error)))
+            raise
+
+        # Any answer proves the interface is reachable, a final NAK that it is not ready
+        self._set_status(key, Fleet.Status(not response.is_nak, monotonic()))
+        return response
+
+    # Cached readiness of a property. Only waits for a check when the property was never checked, an expired status is
+    # served as is while it is checked again in the background.
+    def is_ready(self, key: str) -> bool:
+        return self.status(key).ready
+
+    def status(self, key: str) -> "Fleet.Status":
+        with self._lock:
+            status = self._statuses.get(key)
+        if status is None:
+            return self._schedule(key).result()
+        if status.age > self.ttl:
+            self._schedule(key)
+        return status
+
+    # Snapshot of the cached statuses, never waits on the network. Properties not checked yet are left out.
+    def health(self) -> Dict[str, "Fleet.Status"]:
+        with self._lock:
+            return dict(self._statuses)
+
+    # Checks the readiness of the properties (all by default) concurrently and waits for the results. A check already in
+    # flight is waited for rather than repeated.
+    def refresh(self, keys: Optional[Iterable[str]] = None) -> Dict[str, "Fleet.Status"]:
+        keys = list(self.keys if keys is None else keys)
+        futures = {key: self._schedule(key) for key in keys}
+        return {key: future.result() for key, future in futures.items()}
+
+    def start(self) -> "Fleet":
+        self._stopped.clear()
+        self._heartbeat = threading.Thread(target=self._beat, name="salto-fleet-heartbeat", daemon=True)
+        self._heartbeat.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "Fleet":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # Sweeps without waiting for the checks, so an unreachable property does not hold up the next sweep of the others
+    def _beat(self) -> None:
+        while not self._stopped.is_set():
+            for key in self.keys:
+                self._schedule(key)
+            self._stopped.wait(self.heartbeat_interval)
+
+    # Starts a background check of the property, unless one is in flight already
+    def _schedule(self, key: str) -> "Future[Fleet.Status]":
+        with self._lock:
+            future = self._checks.get(key)
+            if future is not None:
+                return future
+            future = self._checks[key] = self._executor.submit(self._check, key)
+        future.add_done_callback(lambda done: self._checked(key, done))
+        return future
+
+    def _checked(self, key: str, future: "Future[Fleet.Status]") -> None:
+        with self._lock:
+            if self._checks.get(key) is future:
+                del self._checks[key]
+
+    def _check(self, key: str) -> "Fleet.Status":
+        client = self.client(key)
+        started = monotonic()
+        try:
+            ready = client.is_ready
+        except Exception as error:  # unreachable, garbled answers, an open circuit, ...
+            status = Fleet.Status(False, monotonic(), error=str(error) or type(error).__name__)
+        else:
+            finished = monotonic()
+            status = Fleet.Status(ready, finished, latency=finished - started)
+
+        self._set_status(key, status)
+        return status
+
+    def _set_status(self, key: str, status: "Fleet.Status") -> None:
+        with self._lock:
+            if key in self._clients:
+                self._statuses[key] = status
@@ -0,0 +1,289 @@
+import os
+import queue
+import select
+import socket
+import socketserver
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from time import monotonic
+from typing import List, Optional, Tuple, Union
+
+from salto import common
+from salto.client import Client
+from salto.instrumentation import command_name
+from salto.message import Message
+from salto.pool import ConnectionPool
+from salto.protocol import FrameParser
+from salto.resilience import CircuitBreaker
+from salto.response import Response
+
+
+# Local daemon in front of a Salto PC interface, which only serves a few TCP clients and one command at a time. The gateway
+# owns the upstream connections and accepts any number of local clients over TCP or a Unix socket. They speak the usual
+# Salto framing, so a worker only changes its endpoint. Their requests are queued and sent upstream one at a time per
+# upstream connection, and the responses are routed back.
+#
+# A request is ACKed as soon as it is queued, the response frame follows once the interface answered it. When the queue is
+# full the request is answered with a NAK, as is a request which failed upstream (after the retries of the upstream client)
+# or was turned down by the circuit breaker of the upstream client. Requests of a local client which hangs up before they
+# were sent upstream are dropped.
+#
+# The READ_TIMEOUT of a local client covers the time its request waits in the queue as well as the upstream round trip,
+# including the card wait of encoder commands: the ACK only means the request was queued. Give local clients a longer
+# READ_TIMEOUT than the upstream client, or keep the queue short (max_queue) when encoders are busy. The upstream client's
+# own timeouts start once the request is taken from the queue.
+#
+# gateway = Gateway(Client("192.168.1.120:8090"), unix_path="/run/salto/gateway.sock").start()
+# client = Client("unix:/run/salto/gateway.sock")  # in every worker process
+class Gateway:
+    UPSTREAM_CONNECTIONS = 1  # the interface executes a single command at a time anyway
+    MAX_QUEUE = 256  # requests waiting for the interface, the local clients get a NAK beyond
+    IDLE_CHECK = 1.0  # seconds an upstream connection may idle before it is checked with an ENQ ahead of the next request
+    HANG_UP_POLL = 0.5  # seconds between two checks whether a local client waiting for its response is still connected
+    ENCODER_COMMANDS = ("CN", "CC", "CA", "LT", "L", "P")  # commands naming their encoder in the second field, without amount
+
+    class Job:
+        def __init__(self, request: bytes, encoder: Optional[str] = None):
+            self.request = request
+            self.encoder = encoder  # for the encoder circuit of the upstream client's breaker
+            self.future: "Future[Response]" = Future()
+
+    def __init__(self,
+                 upstream: Client,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 unix_path: Optional[str] = None,  # listen on this Unix socket instead of TCP
+                 upstream_connections: int = UPSTREAM_CONNECTIONS,
+                 max_queue: int = MAX_QUEUE):
+        self.upstream = upstream
+        self.unix_path = unix_path
+        self.upstream_connections = upstream_connections
+        self.requests = 0
+        self.rejected = 0
+        self.failed = 0
+        self.abandoned = 0  # requests dropped as their local client hung up before they were sent
+
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Gateway.Job]]" = queue.Queue(max_queue)
+        self._workers: List[threading.Thread] = []
+        self._server: Union[Gateway.TCPServer, Gateway.UnixServer]
+        if unix_path is None:
+            self._server = Gateway.TCPServer((host, port), Gateway.RequestHandler)
+        else:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)  # left over by a previous run
+            self._server = Gateway.UnixServer(unix_path, Gateway.RequestHandler)
+        self._server.gateway = self
+        self._thread: Optional[threading.Thread] = None
+
+    # The endpoint for the local clients
+    @property
+    def endpoint(self) -> str:
+        if self.unix_path is not None:
+            return f"{Client.UNIX_PREFIX}{self.unix_path}"
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    # Requests waiting for the interface
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> "Gateway":
+        for number in range(self.upstream_connections):
+            worker = threading.Thread(target=self._forward, name=f"salto-gateway-upstream-{number}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="salto-gateway", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+
+        if self.unix_path is not None and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    def __enter__(self) -> "Gateway":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # Queues a request for the interface, None when the queue is full
+    def submit(self, request: bytes, encoder: Optional[str] = None) -> Optional["Gateway.Job"]:
+        job = Gateway.Job(request, encoder)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return None
+
+        with self._lock:
+            self.requests += 1
+        return job
+
+    # Sends the queued requests upstream one after the other over a single connection, which is reopened after a failure.
+    # The interface may have dropped a connection which was idle for a while, so it is checked before it is used again.
+    def _forward(self) -> None:
+        conn: Optional[socket.socket] = None
+        used_at = 0.0
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                if not job.future.set_running_or_notify_cancel():
+                    with self._lock:
+                        self.abandoned += 1
+                    continue
+
+                try:
+                    if conn is not None and monotonic() - used_at > Gateway.IDLE_CHECK and not ConnectionPool.is_healthy(self.upstream, conn):
+                        conn.close()
+                        conn = None
+                    if conn is None:
+                        conn = self.upstream.create_connection()
+                    job.future.set_result(self.upstream._send_on(conn, job.request, job.encoder))
+                except Exception as error:
+                    if conn is not None and not isinstance(error, CircuitBreaker.Open):  # an open circuit sent nothing
+                        conn.close()
+                        conn = None
+                    with self._lock:
+                        self.failed += 1
+                    job.future.set_exception(error)
+                used_at = monotonic()
+        finally:
+            if conn is not None:
+                conn.close()
+
+    # Bytes to send back to the local client for a single frame it sent
+    def _answer(self, frame: bytes) -> Tuple[bytes, Optional["Gateway.Job"]]:
+        if frame == common.ENQ:
+            return (common.NAK if self._queue.full() else common.ACK), None
+        if not frame.startswith(common.STX) or len(frame) < 3:
+            return common.NAK, None
+
+        raw_message, lrc = frame[1:-2], frame[-1:]
+        if lrc != common.LRC_SKIP and common.lrc(raw_message) != lrc:
+            return common.NAK, None
+
+        job = self.submit(frame, Gateway._encoder(frame))
+        return (common.NAK if job is None else common.ACK), job
+
+    # Encoder of a request frame, e.g. CN1 and L2 name their encoder just like CN and L
+    @staticmethod
+    def _encoder(frame: bytes) -> Optional[str]:
+        if command_name(frame) not in Gateway.ENCODER_COMMANDS:
+            return None
+        message = Message.decode(frame[1:-2])
+        return message.str_field(1) if len(message.fields) > 1 else None
+
+    # The response of the job, None when the local client hung up while waiting for it. A job which was not sent upstream
+    # yet is then cancelled.
+    @staticmethod
+    def _wait(conn: socket.socket, job: "Gateway.Job") -> Optional[Response]:
+        while True:
+            try:
+                return job.future.result(Gateway.HANG_UP_POLL)
+            except FutureTimeoutError:
+                if Gateway._has_hung_up(conn):
+                    job.future.cancel()
+                    return None
+
+    @staticmethod
+    def _has_hung_up(conn: socket.socket) -> bool:
+        readable, _, _ = select.select([conn], [], [], 0)
+        if not readable:
+            return False
+        try:
+            return conn.recv(1, socket.MSG_PEEK) == b""  # a pipelined request is left for the handler
+        except OSError:
+            return True
+
+    class TCPServer(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+        request_queue_size = 128
+        gateway: "Gateway"
+
+    class UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+        gateway: "Gateway"
+
+    # Serves one local client. Its requests are handled in order, the next one is read once the previous was answered.
+    class RequestHandler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            gateway: Gateway = self.server.gateway  # type: ignore[attr-defined]
+            parser = FrameParser()
+            conn: socket.socket = self.request
+            while True:
+                try:
+                    chunk = conn.recv(Client.RECEIVE_SIZE)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+
+                parser.feed(chunk)
+                for frame in parser.frames():
+                    acknowledgement, job = gateway._answer(frame)
+                    if job is None:
+                        conn.sendall(acknowledgement)
+                        continue
+
+                    try:
+                        conn.sendall(acknowledgement)
+                    except OSError:
+                        job.future.cancel()  # the local client is gone, nobody waits for the response
+                        return
+
+                    try:
+                        response = Gateway._wait(conn, job)
+                    except Exception:
+                        conn.sendall(common.NAK)
+                        continue
+                    if response is None:
+                        return  # the local client hung up
+                    # A final upstream NAK is passed on as is, as is any response frame
+                    conn.sendall(response.raw_response)
+
+
+# python -m salto.gateway 192.168.1.120:8090 --unix /run/salto/gateway.sock
+# python -m salto.gateway 192.168.1.120:8090 --port 8091
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multiplexing gateway in front of a Salto PMS interface")
+    parser.add_argument("upstream", help="endpoint of the Salto interface, host:port")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--connections", type=int, default=Gateway.UPSTREAM_CONNECTIONS, help="upstream connections")
+    parser.add_argument("--max-queue", type=int, default=Gateway.MAX_QUEUE)
+    arguments = parser.parse_args()
+
+    gateway = Gateway(Client(arguments.upstream), arguments.host, arguments.port, arguments.unix, arguments.connections, arguments.max_queue)
+    gateway.start()
+    print(f"Salto gateway for {arguments.upstream} listening on {gateway.endpoint}")
+    try:
+        if gateway._thread is not None:
+            gateway._thread.join()
+    except KeyboardInterrupt:
+        gateway.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from salto import common
+from salto.message import Message
+
+
+# Receives the timings and counts of the requests of a client. The base class ignores everything, subclass it to forward the
+# measurements to a metrics system, or use the MetricsAggregator below.
+#
+# Phases of a request, timed per command (the COMMAND_NAME of the message, "ENQ" for readiness checks):
+#   connect    opening the TCP connection (not tied to a command, a connection serves many)
+#   ack        sending the request until its ACK or NAK arrived
+#   retry      waiting for the interface to become ready again after a NAK
+#   card_wait  from the ACK until the first byte of the response, i.e. the guest presenting a card
+#   read       from the first byte until the complete response frame
+#   total      the whole request, retries included
+#
+# Counters: requests, ack, nak, retry, lrc_failure, error.<code> (Message.ERRORS), bytes_out and bytes_in.
+class Instrumentation:
+    def span(self, phase: str, seconds: float, command: Optional[str] = None) -> None:
+        pass
+
+    def count(self, counter: str, command: Optional[str] = None, amount: int = 1) -> None:
+        pass
+
+
+# Command name of a raw request: "ENQ", or the first field of the message without its amount or track number (CN2 is CN)
+def command_name(request: bytes) -> str:
+    if request == common.ENQ:
+        return "ENQ"
+    fields = request.split(Message.FIELD_DELIMITER, 2)
+    if len(fields) < 3:
+        return "?"
+    return fields[1].decode(Message.ENCODING).rstrip("0123456789")
+
+
+# Latency histogram with fixed buckets, cumulative like Prometheus histograms
+class Histogram:
+    BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # seconds
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)  # the last one counts everything above the largest bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    # Estimated upper bound of the quantile (0 < quantile <= 1), the bound of the bucket it falls in
+    def quantile(self, quantile: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+# Keeps histograms and counters in memory, per command. Read them with snapshot() or expose them with prometheus().
+#
+# metrics = MetricsAggregator()
+# client = Client("192.168.1.120:8090", instrumentation=metrics)
+# ...
+# metrics.snapshot()["spans"]["CN"]["card_wait"]["p99"]
+class MetricsAggregator(Instrumentation):
+    ANY_COMMAND = "*"  # key of the measurements not tied to a command
+
+    def __init__(self, buckets: Tuple[float, ...] = Histogram.BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._spans: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+
+    def span(self, phase: str, seconds: float, command: Optional[str] = None) -> None:
+        key = (command or MetricsAggregator.ANY_COMMAND, phase)
+        with self._lock:
+            histogram = self._spans.get(key)
+            if histogram is None:
+                histogram = self._spans[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, counter: str, command: Optional[str] = None, amount: int = 1) -> None:
+        key = (command or MetricsAggregator.ANY_COMMAND, counter)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            spans: Dict[str, Dict[str, dict]] = {}
+            for (command, phase), histogram in self._spans.items():
+                spans.setdefault(command, {})[phase] = histogram.to_dict()
+            counters: Dict[str, Dict[str, int]] = {}
+            for (command, counter), value in self._counters.items():
+                counters.setdefault(command, {})[counter] = value
+        return {"spans": spans, "counters": counters}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    # Prometheus text exposition format, to serve from a /metrics endpoint
+    def prometheus(self, prefix: str = "salto") -> str:
+        lines: List[str] = []
+        snapshot = self.snapshot()
+
+        lines.append(f"# TYPE {prefix}_phase_seconds histogram")
+        for command, phases in sorted(snapshot["spans"].items()):
+            for phase, histogram in sorted(phases.items()):
+                labels = f'command="{command}",phase="{phase}"'
+                for bound, count in histogram["buckets"].items():
+                    lines.append(f'{prefix}_phase_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{prefix}_phase_seconds_sum{{{labels}}} {histogram['sum']}")
+                lines.append(f"{prefix}_phase_seconds_count{{{labels}}} {histogram['count']}")
+
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for command, counters in sorted(snapshot["counters"].items()):
+            for counter, value in sorted(counters.items()):
+                lines.append(f'{prefix}_events_total{{command="{command}",event="{counter}"}} {value}')
+
+        return "\n".join(lines) + "\n"
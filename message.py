@@ -1,17 +1,23 @@
 import codecs
-import translitcodec  # used to provide "translit/short" encoding
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from salto import common
 from salto.i18n import localized
+from salto.support.lru_cache import LRUCache
+from salto.support.transliteration import LATIN1_TABLE
 
 
 class Message:
     ENCODING: str = "Latin-1"
     FIELD_DELIMITER: bytes = b"\xB3"  # Each field in a message is delimited by this separator character
+    SANITIZE_CACHE_SIZE: int = 4096  # sanitized texts kept, resize with Message.SANITIZE_CACHE.resize()
+    SANITIZE_CACHE: LRUCache[str, bytes] = LRUCache(SANITIZE_CACHE_SIZE)
+    PRECOMPUTED_TRANSLITERATION: bool = True  # transliterate Latin-1 texts with LATIN1_TABLE instead of loading translitcodec
     ERRORS: List[bytes] = [b"ES", b"NC", b"NF", b"OV", b"EP", b"EF", b"TD", b"ED", b"EA", b"OS", b"EO", b"EV", b"EG"]  # Error message keys
 
     def __init__(self, fields: List[bytes]):
         self.fields: List[bytes] = fields
+        self._strings: Optional[Dict[int, str]] = None
 
     # Example: Message.encode('|CN|Online Encoder 1|R|Room 1|')
     @staticmethod
@@ -20,11 +26,28 @@ class Message:
 
     @staticmethod
     def decode(raw_message: bytes) -> "Message":
-        return Message(raw_message.split(Message.FIELD_DELIMITER)[1:-1])
+        message = Message(raw_message.split(Message.FIELD_DELIMITER)[1:-1])
+        message._strings = {}  # received messages are never modified, so their decoded fields can be cached
+        return message
 
+    # Room names, operators and guest names repeat a lot, so sanitized texts are cached. Plain ASCII is left alone by the
+    # transliteration and skips it altogether.
     @staticmethod
     def sanitize_text(text: str) -> bytes:
-        return codecs.encode(text, "translit/short/" + Message.ENCODING, "replace").replace(Message.FIELD_DELIMITER, b"|").replace(b"\r", b"")
+        if text.isascii():
+            return text.encode(Message.ENCODING).replace(b"\r", b"")
+        return Message.SANITIZE_CACHE.get(text, Message._transliterate)
+
+    @staticmethod
+    def _transliterate(text: str) -> bytes:
+        if Message.PRECOMPUTED_TRANSLITERATION and max(text) <= "\xff":
+            transliterated = text.translate(LATIN1_TABLE)
+        else:
+            import translitcodec  # noqa: F401, registers the "translit/short" codec. Loaded on first use, its tables are large.
+
+            transliterated = codecs.encode(text, "translit/short")
+        # Transliterate and encode in two steps, Python 3.9+ normalizes "translit/short/Latin-1" to a codec name translitcodec does not know
+        return transliterated.encode(Message.ENCODING, "replace").replace(Message.FIELD_DELIMITER, b"|").replace(b"\r", b"")
 
     @staticmethod
     def encode_str(text: str) -> bytes:
@@ -38,6 +61,11 @@ class Message:
     def details(self) -> List[str]:
         return [field.decode(Message.ENCODING) for field in self.fields[1:]]
 
+    # Name of the encoder the message is executed on, None for commands which do not use an encoder
+    @property
+    def encoder(self) -> Optional[str]:
+        return None
+
     @property
     def is_error(self) -> bool:
         return self.fields[0] in Message.ERRORS
@@ -53,8 +81,24 @@ class Message:
         else:
             return localized("salto.errors." + self.str_field(0))
 
+    @property
+    def error_code(self) -> Optional[str]:
+        return self.str_field(0) if self.is_error else None
+
+    # The message as sent to the interface: STX, message, ETX and LRC
+    def frame(self, lrc_skip: bool = False) -> bytes:
+        message_bytes = bytes(self)
+        lrc = common.LRC_SKIP if lrc_skip else common.lrc(message_bytes)
+        return common.STX + message_bytes + common.ETX + lrc
+
     def __bytes__(self) -> bytes:
         return Message.FIELD_DELIMITER + Message.FIELD_DELIMITER.join(self.fields) + Message.FIELD_DELIMITER
 
     def str_field(self, field_index: int) -> str:
-        return self.fields[field_index].decode(Message.ENCODING)
+        if self._strings is None:
+            return self.fields[field_index].decode(Message.ENCODING)
+
+        text = self._strings.get(field_index)
+        if text is None:
+            text = self._strings[field_index] = self.fields[field_index].decode(Message.ENCODING)
+        return text
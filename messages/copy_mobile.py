@@ -1,5 +1,13 @@
+from typing import Optional
+
 from salto.messages.encode_card import EncodeCard
 
 
 class CopyMobile(EncodeCard):
     COMMAND_NAME: str = "CCM"
+    DEFAULT_AMOUNT: int = 0  # mobile keys have no card count
+
+    # Mobile keys are sent to a phone number instead of an encoder
+    @property
+    def encoder(self) -> Optional[str]:
+        return None
@@ -1,8 +1,9 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from salto.message import Message
+from salto.support.authorization_set import AuthorizationSet
 from salto.support.card_details import CardDetails
 
 
@@ -14,14 +15,15 @@ class EncodeCard(Message):
         ALL = b"2"  # All written card serial numbers are returned
 
     COMMAND_NAME: str = "CN"
+    DEFAULT_AMOUNT: int = 1  # cards to encode when a template does not say
 
     def __init__(self,
                  amount: int,
                  encoder: str,
                  rooms: List[str],
                  eject_strategy: CardDetails.EjectStrategies = CardDetails.EjectStrategies.RETAIN,
-                 granted_authorizations: Optional[List[int]] = None,
-                 denied_authorizations: Optional[List[int]] = None,
+                 granted_authorizations: Optional[Union[List[int], AuthorizationSet]] = None,
+                 denied_authorizations: Optional[Union[List[int], AuthorizationSet]] = None,
                  valid_from: Optional[datetime] = None,
                  valid_till: Optional[datetime] = None,
                  operator: Optional[str] = None,
@@ -51,3 +53,7 @@ class EncodeCard(Message):
         fields[15] = serial_number_return.value
 
         super().__init__(fields)
+
+    @property
+    def encoder(self) -> Optional[str]:
+        return self.str_field(1)
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from salto.messages.encode_card import EncodeCard
+from salto.support.authorization_set import AuthorizationSet
 
 
 class EncodeMobile(EncodeCard):
@@ -11,8 +12,8 @@ class EncodeMobile(EncodeCard):
                  phone_number: str,
                  text_message: str,
                  rooms: List[str],
-                 granted_authorizations: Optional[List[int]] = None,
-                 denied_authorizations: Optional[List[int]] = None,
+                 granted_authorizations: Optional[Union[List[int], AuthorizationSet]] = None,
+                 denied_authorizations: Optional[Union[List[int], AuthorizationSet]] = None,
                  valid_from: Optional[datetime] = None,
                  valid_till: Optional[datetime] = None,
                  operator: Optional[str] = None,
@@ -30,3 +31,8 @@ class EncodeMobile(EncodeCard):
         )
         self.fields.pop(2)  # Delete eject strategy
         self.fields[14] = self.sanitize_text(text_message)[:256]
+
+    # Mobile keys are sent to a phone number instead of an encoder
+    @property
+    def encoder(self) -> Optional[str]:
+        return None
@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+from salto import common
+from salto.message import Message
+from salto.messages.encode_card import EncodeCard
+from salto.messages.encode_mobile import EncodeMobile
+from salto.support.card_details import CardDetails
+
+
+# A message issued from a template. Its bytes and LRC are assembled by the template, so they are not computed again.
+class TemplateMessage(Message):
+    def __init__(self, fields: List[bytes], message_bytes: bytes, checksum: int, encoder: Optional[str], command_name: str):
+        super().__init__(fields)
+        self._message_bytes = message_bytes
+        self._checksum = checksum
+        self._encoder = encoder
+        self.COMMAND_NAME = command_name
+
+    @property
+    def encoder(self) -> Optional[str]:
+        return self._encoder
+
+    def frame(self, lrc_skip: bool = False) -> bytes:
+        lrc = common.LRC_SKIP if lrc_skip else bytes([self._checksum ^ common.ETX[0]])
+        return common.STX + self._message_bytes + common.ETX + lrc
+
+    def __bytes__(self) -> bytes:
+        return self._message_bytes
+
+
+# Precompiles the static fields of an EncodeCard (or CopyCard, OneShotCard, EncodeMobile, CopyMobile) message once, for
+# issuing many near-identical keys. Each issue only encodes the fields which vary and combines the LRC of the static part
+# with theirs.
+#
+# template = EncodeTemplate(EncodeCard, encoder="Online Encoder 1", granted_authorizations=[1, 2], operator="Front desk", print_info="Conference 2026")
+# for room in rooms:
+#     client.send_message(template.issue(rooms=[room], valid_from=check_in, valid_till=check_out))
+class EncodeTemplate:
+    # Positions of the variable fields in the encoded message
+    CARD_FIELDS: Dict[str, Tuple[int, ...]] = {"amount": (0,), "rooms": (3, 4, 5, 6), "valid_from": (9,), "valid_till": (10,)}
+    MOBILE_FIELDS: Dict[str, Tuple[int, ...]] = {"phone_number": (1,), "rooms": (2, 3, 4, 5), "valid_from": (8,), "valid_till": (9,), "text_message": (14,)}
+
+    class VariableField(ValueError):
+        pass
+
+    def __init__(self, message_class: Type[EncodeCard] = EncodeCard, **static_arguments):
+        self.message_class = message_class
+        self.is_mobile = issubclass(message_class, EncodeMobile)
+        self.variable_fields = EncodeTemplate.MOBILE_FIELDS if self.is_mobile else EncodeTemplate.CARD_FIELDS
+
+        # The amount of a card template is its default for issue(), the other variable fields are only set per issue
+        for name in self.variable_fields:
+            if name in static_arguments and name != "amount":
+                raise EncodeTemplate.VariableField(f"{name} varies per key, pass it to issue() instead of the template")
+
+        if self.is_mobile:
+            prototype: EncodeCard = message_class(phone_number="", text_message="", rooms=[], **static_arguments)
+        else:
+            prototype = message_class(amount=static_arguments.pop("amount", message_class.DEFAULT_AMOUNT), rooms=[], **static_arguments)
+        self.prototype = prototype
+
+        variable_indexes = {index for indexes in self.variable_fields.values() for index in indexes}
+        self.fields: List[bytes] = prototype.fields
+
+        # The message alternates static chunks (delimiters included) with the indexes of variable fields
+        self.layout: List[Union[bytes, int]] = []
+        static_chunk = Message.FIELD_DELIMITER
+        for index, field in enumerate(prototype.fields):
+            if index in variable_indexes:
+                self.layout.append(static_chunk)
+                self.layout.append(index)
+                static_chunk = Message.FIELD_DELIMITER
+            else:
+                static_chunk += field + Message.FIELD_DELIMITER
+        self.layout.append(static_chunk)
+
+        self.static_checksum = 0
+        for part in self.layout:
+            if isinstance(part, bytes):
+                self.static_checksum ^= common.xor(part)
+        self.variable_slots: List[Tuple[int, int]] = [(position, part) for position, part in enumerate(self.layout) if isinstance(part, int)]
+        self.encoder = prototype.encoder
+        self._datetimes: Dict[datetime, bytes] = {}  # keys of a group share a handful of validity datetimes
+
+    def issue(self,
+              rooms: Optional[List[str]] = None,
+              valid_from: Optional[datetime] = None,
+              valid_till: Optional[datetime] = None,
+              amount: Optional[int] = None,
+              phone_number: Optional[str] = None,
+              text_message: Optional[str] = None) -> TemplateMessage:
+        fields = list(self.fields)
+
+        if amount is not None and not self.is_mobile:
+            fields[0] = Message.encode_str(f"{self.message_class.COMMAND_NAME}{str(amount) if amount > 0 else ''}")
+        if rooms is not None:
+            for index, room_index in enumerate(self.variable_fields["rooms"]):
+                fields[room_index] = Message.encode_str(rooms[index]) if index < len(rooms) else b""
+        if valid_from is not None:
+            fields[self.variable_fields["valid_from"][0]] = self._encode_datetime(valid_from)
+        if valid_till is not None:
+            fields[self.variable_fields["valid_till"][0]] = self._encode_datetime(valid_till)
+        if phone_number is not None and self.is_mobile:
+            fields[1] = Message.encode_str(phone_number)
+        if text_message is not None and self.is_mobile:
+            fields[14] = Message.sanitize_text(text_message)[:256]
+
+        parts = list(self.layout)
+        variable_parts = []
+        for position, index in self.variable_slots:
+            parts[position] = fields[index]
+            variable_parts.append(fields[index])
+        checksum = self.static_checksum ^ common.xor(b"".join(variable_parts))
+
+        return TemplateMessage(fields, b"".join(parts), checksum, self.encoder, self.message_class.COMMAND_NAME)
+
+    def _encode_datetime(self, value: datetime) -> bytes:
+        encoded = self._datetimes.get(value)
+        if encoded is None:
+            if len(self._datetimes) >= 256:
+                self._datetimes.clear()
+            encoded = self._datetimes[value] = Message.encode_str(value.strftime(CardDetails.DATETIME_FORMAT))
+        return encoded
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from salto.message import Message
 from salto.support.card_details import CardDetails
@@ -17,3 +17,7 @@ class ReadCard(Message):
             eject_strategy.value,
         ]
         super().__init__(fields)
+
+    @property
+    def encoder(self) -> Optional[str]:
+        return self.str_field(1)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from salto.message import Message
 from salto.support.card_details import CardDetails
@@ -19,3 +19,7 @@ class WriteTrack(Message):
             self.sanitize_text(text),
         ]
         super().__init__(fields)
+
+    @property
+    def encoder(self) -> Optional[str]:
+        return self.str_field(1)
@@ -0,0 +1,189 @@
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import monotonic, sleep
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from salto.client import Client
+from salto.message import Message
+from salto.messages.copy_mobile import CopyMobile
+from salto.messages.encode_mobile import EncodeMobile
+from salto.messages.encode_template import EncodeTemplate
+from salto.resilience import Backoff
+from salto.response import Response
+from salto.scheduler import is_overflow
+
+
+# A mobile key to issue for one guest
+class MobileKey:
+    def __init__(self,
+                 phone_number: str,
+                 rooms: List[str],
+                 valid_from: Optional[datetime] = None,
+                 valid_till: Optional[datetime] = None,
+                 text_message: str = "",
+                 reference: Optional[str] = None):  # anything identifying the guest to the caller, e.g. a reservation number
+        self.phone_number = phone_number
+        self.rooms = rooms
+        self.valid_from = valid_from
+        self.valid_till = valid_till
+        self.text_message = text_message
+        self.reference = reference
+
+
+class MobileKeyResult:
+    def __init__(self, key: MobileKey, response: Optional[Response], exception: Optional[Exception], attempts: int):
+        self.key = key
+        self.response = response
+        self.exception = exception  # the request could not be completed at all, e.g. the interface was unreachable
+        self.attempts = attempts
+
+    @property
+    def is_success(self) -> bool:
+        return self.response is not None and self.response.is_message and not self.response.message.is_error
+
+    # Why the key was not issued: the Salto error (for EG, the error reported for the phone number), a NAK or the exception
+    @property
+    def error(self) -> Optional[str]:
+        if self.exception is not None:
+            return str(self.exception) or type(self.exception).__name__
+        if self.response is None or self.response.is_nak:
+            return "Not acknowledged"
+        return self.response.error
+
+
+class IssuanceProgress:
+    def __init__(self, completed: int, failed: int, elapsed: float):
+        self.completed = completed
+        self.failed = failed
+        self.elapsed = elapsed
+
+    @property
+    def keys_per_second(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"IssuanceProgress(completed={self.completed}, failed={self.failed}, keys_per_second={self.keys_per_second:.1f})"
+
+
+# Issues mobile keys (EncodeMobile, or CopyMobile with copy=True) for large groups. Mobile keys do not wait on an encoder, so
+# they are sent concurrently, each worker over its own connection. Overflows (OV) are retried with backoff, NAKs are retried
+# by the client already. Results come back per guest, in the order of the keys. CopyMobile has no text message, so with
+# copy=True keys with a text message fail with BulkMobileIssuer.TextNotSupported.
+#
+# issuer = BulkMobileIssuer(client, concurrency=8, operator="Front desk", on_progress=print)
+# results = issuer.issue(MobileKey(guest.phone, [guest.room], check_in, check_out, welcome_text) for guest in group)
+# failed = [(result.key.reference, result.error) for result in results if not result.is_success]
+class BulkMobileIssuer:
+    CONCURRENCY = 8
+    RETRIES = 5  # times a key is repeated after an overflow (OV)
+    PROGRESS_INTERVAL = 1.0  # seconds between two progress reports
+
+    class TextNotSupported(ValueError):
+        pass
+
+    def __init__(self,
+                 client: Client,
+                 concurrency: int = CONCURRENCY,
+                 retries: int = RETRIES,
+                 backoff: Optional[Backoff] = None,
+                 copy: bool = False,
+                 on_progress: Optional[Callable[[IssuanceProgress], None]] = None,
+                 progress_interval: float = PROGRESS_INTERVAL,
+                 **static_arguments):  # arguments shared by all keys, e.g. granted_authorizations, operator, print_info
+        self.client = client
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff or client.backoff
+        self.copy = copy
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.static_arguments = static_arguments
+        # The fields shared by all keys of the group are encoded once
+        self.template = None if copy else EncodeTemplate(EncodeMobile, **static_arguments)
+
+    def build_message(self, key: MobileKey) -> Message:
+        if self.template is None:
+            if key.text_message:
+                raise BulkMobileIssuer.TextNotSupported(f"CopyMobile can't send a text message, key {key.reference or key.phone_number}")
+            return CopyMobile(amount=0, encoder=key.phone_number, rooms=key.rooms, valid_from=key.valid_from, valid_till=key.valid_till,
+                              **self.static_arguments)
+        return self.template.issue(phone_number=key.phone_number, rooms=key.rooms, valid_from=key.valid_from, valid_till=key.valid_till,
+                                   text_message=key.text_message)
+
+    def issue(self, keys: Iterable[MobileKey]) -> List[MobileKeyResult]:
+        items = enumerate(keys)
+        lock = threading.Lock()
+        results: Dict[int, MobileKeyResult] = {}
+        progress = {"completed": 0, "failed": 0, "started": monotonic(), "reported": monotonic()}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="salto-mobile") as executor:
+            for worker in [executor.submit(self._work, items, lock, results, progress) for _ in range(self.concurrency)]:
+                worker.result()
+
+        if self.on_progress is not None:
+            self.on_progress(IssuanceProgress(progress["completed"], progress["failed"], monotonic() - progress["started"]))
+        return [results[index] for index in range(len(results))]
+
+    # Issues keys over one connection until the keys run out, reconnecting after a failed request
+    def _work(self, items: Iterator[Tuple[int, MobileKey]], lock: threading.Lock, results: Dict[int, MobileKeyResult], progress: dict) -> None:
+        item = self._next_key(items, lock)
+        while item is not None:
+            failure: Optional[Exception] = None
+            try:
+                with self.client.connection() as conn:
+                    while item is not None:
+                        index, key = item
+                        result = self._issue_key(conn, key)
+                        self._complete(result, index, lock, results, progress)
+                        item = self._next_key(items, lock)
+                        if result.exception is not None and result.attempts > 0:
+                            # Leaving the connection block drops the socket, the next key starts on a fresh one
+                            failure = result.exception
+                            raise failure
+            except Exception as error:
+                if error is not failure and item is not None:  # connecting failed, the key was not sent
+                    self._complete(MobileKeyResult(item[1], None, error, 0), item[0], lock, results, progress)
+                    item = self._next_key(items, lock)
+
+    @staticmethod
+    def _next_key(items: Iterator[Tuple[int, MobileKey]], lock: threading.Lock) -> Optional[Tuple[int, MobileKey]]:
+        with lock:
+            return next(items, None)
+
+    def _issue_key(self, conn: socket.socket, key: MobileKey) -> MobileKeyResult:
+        try:
+            request = self.client.encode_message(self.build_message(key))
+        except BulkMobileIssuer.TextNotSupported as error:
+            return MobileKeyResult(key, None, error, 0)  # nothing was sent, the connection is fine
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # Mobile keys carry the phone number in the encoder field, only the endpoint circuit applies
+                response = self.client._send_on(conn, request)
+            except Exception as error:
+                return MobileKeyResult(key, None, error, attempt)
+
+            # A NAK is final here, the client retried it MAX_RETRIES times already
+            if attempt > self.retries or not is_overflow(response):
+                return MobileKeyResult(key, response, None, attempt)
+            sleep(self.backoff.delay(attempt))
+
+    def _complete(self, result: MobileKeyResult, index: int, lock: threading.Lock, results: Dict[int, MobileKeyResult], progress: dict) -> None:
+        report = None
+        with lock:
+            results[index] = result
+            progress["completed"] += 1
+            if not result.is_success:
+                progress["failed"] += 1
+
+            now = monotonic()
+            if self.on_progress is not None and now - progress["reported"] >= self.progress_interval:
+                progress["reported"] = now
+                report = IssuanceProgress(progress["completed"], progress["failed"], now - progress["started"])
+
+        if report is not None:
+            self.on_progress(report)  # type: ignore[misc]
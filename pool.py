@@ -0,0 +1,175 @@
+import socket
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, Optional, Tuple
+
+from salto import common
+from salto.deadline import CancellationToken, Deadline
+
+if TYPE_CHECKING:
+    from salto.client import Client
+
+
+class ConnectionPool:
+    MAX_SIZE = 4  # live sockets per endpoint, idle and in use combined
+    MAX_IDLE_TIME = 60  # seconds an idle socket is kept before it is evicted
+
+    class Exhausted(Exception):
+        pass
+
+    # pool = ConnectionPool()
+    # client = Client("192.168.1.120:8090", pool=pool)
+    def __init__(self, max_size: int = MAX_SIZE, max_idle_time: float = MAX_IDLE_TIME, acquire_timeout: Optional[float] = None):
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Condition()
+        self._idle: Dict[Tuple[str, int], Deque[Tuple[socket.socket, float]]] = {}
+        self._live: Dict[Tuple[str, int], int] = {}
+        self._closed = False
+
+    @contextmanager
+    def connection(self, client: "Client", deadline: Optional[Deadline] = None) -> Iterator[socket.socket]:
+        conn = self.acquire(client, deadline)
+        try:
+            yield conn
+        except BaseException:
+            # The conversation on this socket is in an unknown state, never hand it out again
+            self.release(client, conn, broken=True)
+            raise
+        else:
+            self.release(client, conn)
+
+    # The deadline of the request, if any, also bounds waiting for a free slot, connecting and the health check
+    def acquire(self, client: "Client", deadline: Optional[Deadline] = None) -> socket.socket:
+        if deadline is None or deadline.token is None:
+            return self._acquire(client, deadline)
+
+        # A cancelled request stops waiting for a slot right away
+        unregister = deadline.token.register(self._wake)
+        try:
+            return self._acquire(client, deadline)
+        finally:
+            unregister()
+
+    def _acquire(self, client: "Client", deadline: Optional[Deadline]) -> socket.socket:
+        endpoint = (client.host, client.port)
+        wait_until = None if self.acquire_timeout is None else monotonic() + self.acquire_timeout
+        if deadline is not None and deadline.expires_at is not None:
+            wait_until = deadline.expires_at if wait_until is None else min(wait_until, deadline.expires_at)
+
+        while True:
+            with self._lock:
+                conn = self._take_idle(endpoint)
+                if conn is None:
+                    while self._live.get(endpoint, 0) >= self.max_size:
+                        if deadline is not None:
+                            deadline.check()
+                        remaining = None if wait_until is None else wait_until - monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise ConnectionPool.Exhausted(f"No SALTO connection available for {client.host}:{client.port}")
+                        self._lock.wait(remaining)
+                        conn = self._take_idle(endpoint)
+                        if conn is not None:
+                            break
+                # Reserve the slot before leaving the lock, connecting and health checks happen outside of it
+                if conn is None:
+                    self._live[endpoint] = self._live.get(endpoint, 0) + 1
+
+            if conn is None:
+                try:
+                    return client.create_connection(client.CONNECT_TIMEOUT if deadline is None else deadline.timeout(client.CONNECT_TIMEOUT))
+                except BaseException:
+                    self._forget(endpoint)
+                    raise
+
+            try:
+                healthy = self.is_healthy(client, conn, deadline)
+            except BaseException:
+                self._discard(endpoint, conn)
+                raise
+            if healthy:
+                return conn
+
+            self._discard(endpoint, conn)
+
+    def release(self, client: "Client", conn: socket.socket, broken: bool = False) -> None:
+        endpoint = (client.host, client.port)
+        if broken or self._closed:
+            self._discard(endpoint, conn)
+            return
+
+        with self._lock:
+            self._idle.setdefault(endpoint, deque()).append((conn, monotonic()))
+            self._lock.notify()
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            for endpoint in list(self._idle):
+                self._evict_expired(endpoint)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle = [(endpoint, conn) for endpoint, conns in self._idle.items() for conn, _ in conns]
+            self._idle.clear()
+
+        for endpoint, conn in idle:
+            self._discard(endpoint, conn)
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _take_idle(self, endpoint: Tuple[str, int]) -> Optional[socket.socket]:
+        self._evict_expired(endpoint)
+        idle = self._idle.get(endpoint)
+        if idle:
+            # Most recently used first, it is the least likely to be closed by the interface
+            conn, _ = idle.pop()
+            return conn
+        return None
+
+    def _evict_expired(self, endpoint: Tuple[str, int]) -> None:
+        idle = self._idle.get(endpoint)
+        now = monotonic()
+        while idle and now - idle[0][1] > self.max_idle_time:
+            conn, _ = idle.popleft()
+            self._live[endpoint] -= 1
+            conn.close()
+            self._lock.notify()
+
+    # Whether an idle socket still answers an ENQ. Also used by the gateway for its own upstream sockets.
+    @staticmethod
+    def is_healthy(client: "Client", conn: socket.socket, deadline: Optional[Deadline] = None) -> bool:
+        try:
+            # Either acknowledgement proves the socket is alive, a NAK is handled by the retries of the request itself
+            if deadline is None:
+                response = client._send_request(conn, common.ENQ)
+            else:
+                with deadline.guard(conn):
+                    response = client._send_request(conn, common.ENQ, deadline=deadline)
+            return response.is_ack or response.is_nak
+        except (Deadline.Exceeded, CancellationToken.Cancelled):
+            raise  # the request gave up, that says nothing about the socket
+        except (OSError, client.InvalidAcknowledgement):
+            return False
+
+    def _wake(self) -> None:
+        with self._lock:
+            self._lock.notify_all()
+
+    def _discard(self, endpoint: Tuple[str, int], conn: socket.socket) -> None:
+        try:
+            conn.close()
+        finally:
+            self._forget(endpoint)
+
+    def _forget(self, endpoint: Tuple[str, int]) -> None:
+        with self._lock:
+            self._live[endpoint] -= 1
+            self._lock.notify()
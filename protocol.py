@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Deque, Iterator, Optional
+
+from salto import common
+
+
+# Incremental, IO-free parser for the byte stream of a SALTO connection. Bytes are fed in chunks of any size and come out
+# as complete frames: a single control char (ENQ, ACK, NAK) or a full message (STX ... ETX LRC).
+#
+# parser = FrameParser()
+# parser.feed(conn.recv(4096))
+# for frame in parser.frames():
+#     ...
+class FrameParser:
+    def __init__(self):
+        self._buffer = bytearray()
+        self._frames: Deque[bytes] = deque()
+        self._etx_search_start = 1  # position in the buffer where the search for ETX resumes
+
+    def feed(self, data: bytes) -> None:
+        self._buffer += data
+        self._parse()
+
+    def next_frame(self) -> Optional[bytes]:
+        return self._frames.popleft() if self._frames else None
+
+    def frames(self) -> Iterator[bytes]:
+        while self._frames:
+            yield self._frames.popleft()
+
+    @property
+    def has_frame(self) -> bool:
+        return bool(self._frames)
+
+    # Returns and clears the bytes of an incomplete frame, e.g. when the connection was closed halfway
+    def flush(self) -> bytes:
+        remainder = bytes(self._buffer)
+        self._buffer.clear()
+        self._etx_search_start = 1
+        return remainder
+
+    def _parse(self) -> None:
+        buffer = self._buffer
+        start = 0
+        while start < len(buffer):
+            if buffer[start] != common.STX[0]:
+                # Control chars, or any unexpected byte which is handed over as is so the client can reject it
+                self._frames.append(bytes(buffer[start:start + 1]))
+                start += 1
+                continue
+
+            etx = buffer.find(common.ETX, max(start + 1, self._etx_search_start))
+            if etx == -1 or etx + 1 >= len(buffer):  # ETX is followed by the LRC char
+                self._etx_search_start = len(buffer) if etx == -1 else etx
+                break
+
+            self._frames.append(bytes(buffer[start:etx + 2]))
+            start = etx + 2
+            self._etx_search_start = start + 1
+
+        if start:
+            del buffer[:start]
+            self._etx_search_start = max(1, self._etx_search_start - start)
@@ -0,0 +1,129 @@
+import threading
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    import random
+
+
+# Exponential backoff with jitter. The jitter spreads the retries of many workers hitting the same interface, instead of
+# all of them retrying in lockstep.
+#
+# backoff = Backoff(initial=0.2, maximum=2.0)
+# sleep(backoff.delay(attempt))
+class Backoff:
+    INITIAL = 0.2  # seconds before the first retry
+    MULTIPLIER = 2.0
+    MAXIMUM = 2.0  # seconds, the longest delay between two retries
+    JITTER = 0.5  # share of the delay which is randomized: 0.5 waits between 50% and 100% of the delay
+
+    def __init__(self,
+                 initial: float = INITIAL,
+                 multiplier: float = MULTIPLIER,
+                 maximum: float = MAXIMUM,
+                 jitter: float = JITTER,
+                 random_source: Optional["random.Random"] = None):
+        self.initial = initial
+        self.multiplier = multiplier
+        self.maximum = maximum
+        self.jitter = jitter
+        self.random = random_source  # created on first use, every client has a backoff but few ever retry
+
+    # Seconds to wait before retry number `attempt` (1 for the first retry)
+    def delay(self, attempt: int) -> float:
+        if self.random is None:
+            import random
+
+            self.random = random.Random()
+        delay = min(self.maximum, self.initial * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * self.random.random())
+
+
+# Shared circuit breaker for Salto interfaces and their encoders. After `failure_threshold` consecutive failures of a key
+# (an endpoint, or an encoder of an endpoint) the circuit opens and requests for it fail fast with CircuitBreaker.Open for
+# `cool_down` seconds. Afterwards a single caller is let through to probe the key: its success closes the circuit again,
+# its failure starts a new cool-down. Share one breaker between all clients of a process.
+#
+# breaker = CircuitBreaker()
+# client = Client("192.168.1.120:8090", breaker=breaker)
+class CircuitBreaker:
+    FAILURE_THRESHOLD = 3  # consecutive failures opening the circuit
+    COOL_DOWN = 10.0  # seconds requests fail fast before recovery is probed
+    FAILURE_ERRORS = ("NC", "NF")  # error codes counting as a failure of the encoder (no communication, no files)
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"  # cool-down over, a probe is in flight
+
+    class Open(Exception):
+        def __init__(self, key: str, retry_in: float):
+            super().__init__(f"SALTO circuit for {key} is open, retry in {retry_in:.1f}s")
+            self.key = key
+            self.retry_in = retry_in
+
+    class Circuit:
+        def __init__(self):
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+            self.opened_at = 0.0
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, cool_down: float = COOL_DOWN, clock: Callable[[], float] = monotonic):
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, CircuitBreaker.Circuit] = {}
+
+    # Raises CircuitBreaker.Open while the key fails fast. Returns True when the caller is the probe of a recovering key, it
+    # must then report its outcome with success() or failure().
+    def acquire(self, key: str) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.state == CircuitBreaker.CLOSED:
+                return False
+
+            # A probe which never reported back is given up on after another cool-down
+            now = self.clock()
+            retry_in = circuit.opened_at + self.cool_down - now
+            if retry_in > 0:
+                raise CircuitBreaker.Open(key, retry_in)
+
+            circuit.state = CircuitBreaker.HALF_OPEN
+            circuit.opened_at = now
+            return True
+
+    def success(self, key: str) -> None:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None:
+                circuit.state = CircuitBreaker.CLOSED
+                circuit.failures = 0
+
+    def failure(self, key: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(key, CircuitBreaker.Circuit())
+            circuit.failures += 1
+            if circuit.state == CircuitBreaker.HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = CircuitBreaker.OPEN
+                circuit.opened_at = self.clock()
+
+    # Hands back the probe of a key without an outcome, e.g. the request was cancelled before reaching the key. The next
+    # caller probes right away instead of waiting for another cool-down.
+    def release(self, key: str) -> None:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None and circuit.state == CircuitBreaker.HALF_OPEN:
+                circuit.state = CircuitBreaker.OPEN
+                circuit.opened_at = self.clock() - self.cool_down
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return CircuitBreaker.CLOSED if circuit is None else circuit.state
+
+    def reset(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(key, None)
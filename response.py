@@ -1,22 +1,25 @@
-import re
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from salto import common
 from salto.message import Message
 
+if TYPE_CHECKING:
+    from salto.audit.audit_record import AuditRecord
+    from salto.support.card_details import CardDetails
+
 
 class Response:
     class InvalidMessage(Exception):
         pass
 
-    RAW_MESSAGE_RE = re.compile(rb"^" + common.STX + rb"(.*)" + common.ETX + rb"(.*)$")
-
     def __init__(self, raw_response: bytes):
         self.raw_response = raw_response
-        self._lrc: Optional[bytes] = None
-        self._raw_message: Optional[bytes] = None
+        self._lrc: bytes = b""
+        self._raw_message: Optional[memoryview] = None
+        self._message: Optional[Message] = None
 
         if self.is_message:
+            self._split()
             self.verify()
 
     @property
@@ -32,27 +35,48 @@ class Response:
         return self.raw_response.startswith(common.STX)
 
     def verify(self) -> None:
-        if self.lrc != common.LRC_SKIP and common.lrc(self.raw_message) != self.lrc:
+        if self.lrc != common.LRC_SKIP and (self._raw_message is None or common.lrc(self._raw_message) != self.lrc):
             raise Response.InvalidMessage("LRC is incorrect!")
 
     @property
     def lrc(self) -> bytes:
-        if self._lrc is not None:
-            return self._lrc
-
-        match = Response.RAW_MESSAGE_RE.search(self.raw_response)
-        self._lrc = match[2] if match is not None else b""
         return self._lrc
 
     @property
     def raw_message(self) -> bytes:
-        if self._raw_message is not None:
-            return self._raw_message
-
-        match = Response.RAW_MESSAGE_RE.search(self.raw_response)
-        self._raw_message = match[1] if match is not None else b""
-        return self._raw_message
+        return b"" if self._raw_message is None else self._raw_message.tobytes()
 
     @property
     def message(self) -> Message:
-        return Message.decode(self.raw_message)
+        if self._message is None:
+            self._message = Message.decode(self.raw_message)
+        return self._message
+
+    # Typed views on the message, created on demand. Their modules are only imported once used, a client which only sends
+    # checkouts or ENQs never loads them.
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.message.error if self.is_message else None
+
+    @property
+    def card_details(self) -> "CardDetails":
+        from salto.support.card_details import CardDetails
+
+        return CardDetails(self.message)
+
+    @property
+    def audit_record(self) -> "AuditRecord":
+        from salto.audit.audit_record import AuditRecord
+
+        return AuditRecord(self.message)
+
+    # Finds the frame boundaries in a single scan: fields never contain ETX, so the first one ends the message and is
+    # followed by the LRC char. The message is kept as a view on the response instead of a copy.
+    def _split(self) -> None:
+        etx = self.raw_response.find(common.ETX, 1)
+        if etx == -1:
+            return
+
+        self._raw_message = memoryview(self.raw_response)[1:etx]
+        self._lrc = self.raw_response[etx + 1:etx + 2]
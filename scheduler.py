@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import sleep
+from typing import Deque, Dict, Tuple
+
+from salto.client import Client
+from salto.message import Message
+from salto.resilience import Backoff
+from salto.response import Response
+
+
+# Runs messages for different encoders in parallel while never sending two jobs to the same encoder at once.
+# Jobs without an encoder (e.g. Checkout, EncodeMobile) are not queued and run as soon as a worker is free.
+#
+# with EncoderScheduler(client) as scheduler:
+#     future = scheduler.submit(EncodeCard(amount=1, encoder="Online Encoder 1", rooms=["Room 1"]))
+#     response = future.result()
+class EncoderScheduler:
+    MAX_WORKERS = 8
+    OV_RETRIES = 5  # times a job is repeated when the encoder reports an overflow (OV)
+    OV_BACKOFF = 0.5  # seconds to wait before the first OV retry, doubled (with jitter) on every following one
+
+    def __init__(self, client: Client, max_workers: int = MAX_WORKERS, ov_retries: int = OV_RETRIES, ov_backoff: float = OV_BACKOFF):
+        self.client = client
+        self.ov_retries = ov_retries
+        self.ov_backoff = ov_backoff
+        self.backoff = Backoff(initial=ov_backoff, maximum=ov_backoff * 2 ** ov_retries)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="salto-encoder")
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[Tuple[Message, Future]]] = {}
+        self._busy_encoders = set()
+
+    def submit(self, message: Message) -> "Future[Response]":
+        future: Future = Future()
+        encoder = message.encoder
+
+        if encoder is None:
+            self._executor.submit(self._run, message, future)
+            return future
+
+        with self._lock:
+            self._queues.setdefault(encoder, deque()).append((message, future))
+            if encoder in self._busy_encoders:
+                return future
+            self._busy_encoders.add(encoder)
+
+        self._executor.submit(self._drain, encoder)
+        return future
+
+    def pending(self, encoder: str) -> int:
+        with self._lock:
+            return len(self._queues.get(encoder, ()))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "EncoderScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    # Runs the queued jobs of a single encoder one after the other, on one worker
+    def _drain(self, encoder: str) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues[encoder]
+                if not queue:
+                    del self._queues[encoder]
+                    self._busy_encoders.discard(encoder)
+                    return
+                message, future = queue.popleft()
+
+            self._run(message, future)
+
+    def _run(self, message: Message, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            future.set_result(self._send(message))
+        except BaseException as error:
+            future.set_exception(error)
+
+    def _send(self, message: Message) -> Response:
+        attempt = 0
+        while True:
+            response = self.client.send_message(message)
+            if attempt >= self.ov_retries or not is_overflow(response):
+                return response
+
+            attempt += 1
+            sleep(self.backoff.delay(attempt))
+
+
+def is_overflow(response: Response) -> bool:
+    return response.is_message and response.message.error_code == "OV"
@@ -0,0 +1,122 @@
+from typing import Iterable, Iterator, Union
+
+# Character encoding authorization 1, 2, ..., 62 in the authorization fields of a message
+ALPHABET: bytes = b"123456789abcdefghijklmnopqrstuvwxyz!#$%&()*+,-./:;<=>?@[\\]^_{}"
+
+
+# Set of authorizations (1 to 62) kept as the bits of a single 62-bit integer (authorization n is bit n - 1), so comparing and combining the authorizations of
+# many cards is plain integer arithmetic.
+#
+# granted = AuthorizationSet([1, 2, 10])
+# missing = required - card_details.granted_authorizations
+class AuthorizationSet:
+    __slots__ = ("mask",)
+
+    ALPHABET: bytes = ALPHABET
+    MAX_AUTHORIZATION: int = len(ALPHABET)
+
+    # bytes.translate tables: authorization number to character and character to authorization number (0 if invalid)
+    ENCODE_TABLE: bytes = bytes(ALPHABET[index - 1] if 1 <= index <= len(ALPHABET) else 0 for index in range(256))
+    DECODE_TABLE: bytes = bytes(ALPHABET.index(char) + 1 if char in ALPHABET else 0 for char in range(256))
+
+    def __init__(self, authorizations: Iterable[int] = ()):
+        mask = 0
+        for authorization in authorizations:
+            if not 1 <= authorization <= AuthorizationSet.MAX_AUTHORIZATION:
+                raise ValueError(f"Invalid SALTO authorization: {authorization!r}")
+            mask |= 1 << (authorization - 1)
+        self.mask: int = mask
+
+    @staticmethod
+    def from_mask(mask: int) -> "AuthorizationSet":
+        authorization_set = AuthorizationSet()
+        authorization_set.mask = mask
+        return authorization_set
+
+    @staticmethod
+    def decode(authorization_field: bytes) -> "AuthorizationSet":
+        authorizations = authorization_field.translate(AuthorizationSet.DECODE_TABLE)
+        if 0 in authorizations:
+            raise ValueError(f"Invalid SALTO authorization field: {authorization_field!r}")
+
+        mask = 0
+        for authorization in authorizations:
+            mask |= 1 << (authorization - 1)
+        return AuthorizationSet.from_mask(mask)
+
+    def encode(self) -> bytes:
+        return bytes(self).translate(AuthorizationSet.ENCODE_TABLE)
+
+    # The authorization numbers in ascending order, one per byte
+    def __bytes__(self) -> bytes:
+        return bytes(list(self))
+
+    def __iter__(self) -> Iterator[int]:
+        mask = self.mask
+        while mask:
+            lowest_bit = mask & -mask
+            yield lowest_bit.bit_length()
+            mask ^= lowest_bit
+
+    def __len__(self) -> int:
+        return bin(self.mask).count("1")
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __contains__(self, authorization: object) -> bool:
+        return isinstance(authorization, int) and 1 <= authorization <= AuthorizationSet.MAX_AUTHORIZATION and bool(self.mask >> (authorization - 1) & 1)
+
+    def __or__(self, other: "AuthorizationSet") -> "AuthorizationSet":
+        return AuthorizationSet.from_mask(self.mask | _mask(other))
+
+    def __and__(self, other: "AuthorizationSet") -> "AuthorizationSet":
+        return AuthorizationSet.from_mask(self.mask & _mask(other))
+
+    def __sub__(self, other: "AuthorizationSet") -> "AuthorizationSet":
+        return AuthorizationSet.from_mask(self.mask & ~_mask(other))
+
+    def __xor__(self, other: "AuthorizationSet") -> "AuthorizationSet":
+        return AuthorizationSet.from_mask(self.mask ^ _mask(other))
+
+    def __le__(self, other: "AuthorizationSet") -> bool:
+        return self.mask & ~_mask(other) == 0
+
+    def __ge__(self, other: "AuthorizationSet") -> bool:
+        return _mask(other) & ~self.mask == 0
+
+    def __lt__(self, other: "AuthorizationSet") -> bool:
+        return self <= other and self.mask != _mask(other)
+
+    def __gt__(self, other: "AuthorizationSet") -> bool:
+        return self >= other and self.mask != _mask(other)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, AuthorizationSet):
+            return self.mask == other.mask
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __repr__(self) -> str:
+        return f"AuthorizationSet({list(self)!r})"
+
+    def isdisjoint(self, other: "AuthorizationSet") -> bool:
+        return self.mask & _mask(other) == 0
+
+    issubset = __le__
+    issuperset = __ge__
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+    symmetric_difference = __xor__
+
+
+# Set operations also accept plain iterables of authorization numbers
+def _mask(authorizations: Union[AuthorizationSet, Iterable[int]]) -> int:
+    if isinstance(authorizations, AuthorizationSet):
+        return authorizations.mask
+    return AuthorizationSet(authorizations).mask
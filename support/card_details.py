@@ -1,8 +1,9 @@
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 from salto.message import Message
+from salto.support.authorization_set import AuthorizationSet
 
 
 class CardDetails:
@@ -20,17 +21,8 @@ class CardDetails:
         UNIDENTIFIED_CARD = 4
         GUEST_CARD = 5
 
-    AUTHORIZATION_MAPPINGS: Dict[int, bytes] = {
-        1: b"1", 2: b"2", 3: b"3", 4: b"4", 5: b"5", 6: b"6", 7: b"7", 8: b"8",
-        9: b"9", 10: b"a", 11: b"b", 12: b"c", 13: b"d", 14: b"e", 15: b"f",
-        16: b"g", 17: b"h", 18: b"i", 19: b"j", 20: b"k", 21: b"l", 22: b"m",
-        23: b"n", 24: b"o", 25: b"p", 26: b"q", 27: b"r", 28: b"s", 29: b"t",
-        30: b"u", 31: b"v", 32: b"w", 33: b"x", 34: b"y", 35: b"z", 36: b"!",
-        37: b"#", 38: b"$", 39: b"%", 40: b"&", 41: b"(", 42: b")", 43: b"*",
-        44: b"+", 45: b",", 46: b"-", 47: b".", 48: b"/", 49: b":", 50: b";",
-        51: b"<", 52: b"=", 53: b">", 54: b"?", 55: b"@", 56: b"[", 57: b"\\",
-        58: b"]", 59: b"^", 60: b"_", 61: b"{", 62: b"}"
-    }
+    # 1: b"1", ..., 9: b"9", 10: b"a", ..., 35: b"z", 36: b"!", ..., 62: b"}"
+    AUTHORIZATION_MAPPINGS: Dict[int, bytes] = {index + 1: bytes([char]) for index, char in enumerate(AuthorizationSet.ALPHABET)}
 
     AUTHORIZATION_MAPPINGS_INVERTED: Dict[int, int] = {v[0]: k for k, v in AUTHORIZATION_MAPPINGS.items()}
 
@@ -39,7 +31,9 @@ class CardDetails:
         self.message = message
 
     @classmethod
-    def encode_authorizations(cls, authorizations: List[int]) -> bytes:
+    def encode_authorizations(cls, authorizations: Union[List[int], AuthorizationSet]) -> bytes:
+        if isinstance(authorizations, AuthorizationSet):
+            return authorizations.encode()
         return b"".join(cls.AUTHORIZATION_MAPPINGS[auth] for auth in authorizations)
 
     @classmethod
@@ -97,10 +91,10 @@ class CardDetails:
         return ""
 
     @property
-    def granted_authorizations(self) -> List[int]:
+    def granted_authorizations(self) -> AuthorizationSet:
         if self.is_quest_card:
-            return self.decode_authorizations(self.message.fields[8])
-        return []
+            return AuthorizationSet.decode(self.message.fields[8])
+        return AuthorizationSet()
 
     @property
     def valid_from(self) -> Optional[datetime]:
@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# Bounded, thread-safe least-recently-used cache with hit/miss statistics. A maxsize of 0 disables caching.
+class LRUCache(Generic[K, V]):
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Returns the cached value, or computes and stores it. The computation runs outside the lock, so two threads missing
+    # the same key at the same time both compute it.
+    def get(self, key: K, compute: Callable[[K], V]) -> V:
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = compute(key)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = value
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,43 @@
+import codecs
+from typing import Dict
+
+# "translit/short" transliteration of the Latin-1 range (U+0080 to U+00FF), precomputed from translitcodec. It is the same
+# char by char mapping, so texts within Latin-1 are transliterated with str.translate without loading translitcodec.
+#
+# Regenerate after upgrading translitcodec: python -m salto.support.transliteration
+LATIN1_TABLE: Dict[int, str] = {
+    0xA0: ' ', 0xA1: '!', 0xA2: 'c', 0xA3: 'GBP', 0xA5: 'Y', 0xA6: '|', 0xA7: 'S', 0xA8: ' \u0308', 0xA9: 'c', 0xAA: 'a',
+    0xAB: '<<', 0xAC: '-', 0xAD: '-', 0xAE: '(R)', 0xAF: ' \u0304', 0xB0: ' ', 0xB1: '+/-', 0xB2: '2', 0xB3: '3',
+    0xB4: ' \u0301', 0xB5: '\u03bc', 0xB6: 'P', 0xB7: '.', 0xB8: ' \u0327', 0xB9: '1', 0xBA: 'o', 0xBB: '>>', 0xBC: '1/4',
+    0xBD: '1/2', 0xBE: '3/4', 0xBF: '?', 0xC0: 'A', 0xC1: 'A', 0xC2: 'A', 0xC3: 'A', 0xC4: 'A', 0xC5: 'A', 0xC6: 'A',
+    0xC7: 'C', 0xC8: 'E', 0xC9: 'E', 0xCA: 'E', 0xCB: 'E', 0xCC: 'I', 0xCD: 'I', 0xCE: 'I', 0xCF: 'I', 0xD0: 'D',
+    0xD1: 'N', 0xD2: 'O', 0xD3: 'O', 0xD4: 'O', 0xD5: 'O', 0xD6: 'O', 0xD7: 'x', 0xD8: 'O', 0xD9: 'U', 0xDA: 'U',
+    0xDB: 'U', 0xDC: 'U', 0xDD: 'Y', 0xDE: 'Th', 0xDF: 'ss', 0xE0: 'a', 0xE1: 'a', 0xE2: 'a', 0xE3: 'a', 0xE4: 'a',
+    0xE5: 'a', 0xE6: 'a', 0xE7: 'c', 0xE8: 'e', 0xE9: 'e', 0xEA: 'e', 0xEB: 'e', 0xEC: 'i', 0xED: 'i', 0xEE: 'i',
+    0xEF: 'i', 0xF0: 'd', 0xF1: 'n', 0xF2: 'o', 0xF3: 'o', 0xF4: 'o', 0xF5: 'o', 0xF6: 'o', 0xF7: ':', 0xF8: 'o',
+    0xF9: 'u', 0xFA: 'u', 0xFB: 'u', 0xFC: 'u', 0xFD: 'y', 0xFE: 'th', 0xFF: 'y',
+}
+
+
+def generate() -> Dict[int, str]:
+    import translitcodec  # noqa: F401, registers the "translit" codecs
+
+    table = {}
+    for codepoint in range(0x80, 0x100):
+        transliterated = codecs.encode(chr(codepoint), "translit/short")
+        if transliterated != chr(codepoint):
+            table[codepoint] = transliterated
+    return table
+
+
+def main() -> None:
+    table = generate()
+    if table == LATIN1_TABLE:
+        print("LATIN1_TABLE is up to date")
+    else:
+        print("LATIN1_TABLE differs from translitcodec, replace it with:")
+        print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from salto import common
+from salto.client import Client
+from salto.message import Message
+from salto.messages.checkout import Checkout
+from salto.messages.copy_card import CopyCard
+from salto.messages.copy_mobile import CopyMobile
+from salto.messages.encode_card import EncodeCard
+from salto.messages.encode_mobile import EncodeMobile
+from salto.messages.encode_template import EncodeTemplate
+from salto.messages.one_shot_card import OneShotCard
+from salto.messages.read_card import ReadCard
+from salto.messages.read_track import ReadTrack
+from salto.messages.write_track import WriteTrack
+from salto.pool import ConnectionPool
+from salto.response import Response
+from salto.support.card_details import CardDetails
+from salto.testing.mock_server import MockServer
+
+VALID_FROM = datetime(2026, 3, 1, 14, 0)
+VALID_TILL = VALID_FROM + timedelta(days=3)
+PRINT_INFO = "Jöhn Döe\nAnonymousville\nRoom 214"
+TEXT_MESSAGE = "Welcome to Hotel Zürich! Your mobile key for room 214 is valid until Thursday. " * 3
+
+# Cold import of what a short-lived job sending a Checkout or ENQ needs, in a fresh interpreter
+IMPORT_STATEMENT = "import salto.client, salto.messages.checkout"
+IMPORT_BUDGET_MS = 60.0
+HEAVY_MODULES = ("translitcodec", "logging", "concurrent.futures", "random", "salto.support.card_details", "salto.audit.audit_record")
+
+
+def frame(fields: List[bytes]) -> bytes:
+    raw_message = bytes(Message(fields))
+    return common.STX + raw_message + common.ETX + common.lrc(raw_message)
+
+
+# Realistic answers of the interface, as received by the client
+ENCODE_RESPONSE = frame([b"CN1", b"Online Encoder 1", b"04A2B3C4D5E6F7"])
+AUDIT_RESPONSE = frame([b"WN", b"Room 214", b"01/03", b"02:17", b"0", b"I", b"Room 214", b"#0", b""])
+MOBILE_RESPONSE = frame([b"CNM", b"+31612345678", Message.encode_str(TEXT_MESSAGE[:256])])
+READ_CARD_MESSAGE = Message.decode(frame([
+    b"LT", b"Online Encoder 1", b"Room 214", b"Room 215", b"", b"", b"CI", b"0", b"123abc",
+    b"1400010326", b"1100040326", b"Front desk",
+])[1:-2])
+
+MESSAGES: Dict[str, Callable[[], Message]] = {
+    "Checkout": lambda: Checkout(room="Room 214"),
+    "EncodeCard": lambda: EncodeCard(amount=1, encoder="Online Encoder 1", rooms=["Room 214", "Room 215"], granted_authorizations=[1, 2, 3],
+                                     valid_from=VALID_FROM, valid_till=VALID_TILL, operator="Front desk", print_info=PRINT_INFO),
+    "CopyCard": lambda: CopyCard(amount=1, encoder="Online Encoder 1", rooms=["Room 214"], valid_from=VALID_FROM, valid_till=VALID_TILL),
+    "OneShotCard": lambda: OneShotCard(amount=1, encoder="Online Encoder 1", rooms=["Room 214"]),
+    "EncodeMobile": lambda: EncodeMobile(phone_number="+31612345678", text_message=TEXT_MESSAGE, rooms=["Room 214"], valid_from=VALID_FROM,
+                                         valid_till=VALID_TILL, print_info=PRINT_INFO),
+    "CopyMobile": lambda: CopyMobile(amount=0, encoder="+31612345678", rooms=["Room 214"], valid_from=VALID_FROM, valid_till=VALID_TILL),
+    "ReadCard": lambda: ReadCard(encoder="Online Encoder 1"),
+    "ReadTrack": lambda: ReadTrack(track=1, encoder="Online Encoder 1"),
+    "WriteTrack": lambda: WriteTrack(track=1, encoder="Online Encoder 1", text="Guest 214 / Jöhn Döe"),
+}
+
+
+def read_card_details() -> None:
+    card_details = CardDetails(READ_CARD_MESSAGE)
+    (card_details.rooms, card_details.copy_number, card_details.granted_authorizations, card_details.valid_from,
+     card_details.valid_till, card_details.operator)
+
+
+def micro_benchmarks() -> Dict[str, Callable[[], Any]]:
+    benchmarks: Dict[str, Callable[[], Any]] = {f"message.{name}": build for name, build in MESSAGES.items()}
+    client = Client("127.0.0.1:0")
+    encode_card = MESSAGES["EncodeCard"]()
+    payloads = {size: bytes(range(32, 127)) * (size // 95 + 1) for size in (16, 256, 4096)}
+
+    template = EncodeTemplate(EncodeCard, encoder="Online Encoder 1", granted_authorizations=[1, 2, 3], operator="Front desk", print_info=PRINT_INFO)
+
+    benchmarks.update({
+        "client.encode_message.EncodeCard": lambda: client.encode_message(encode_card),
+        "client.encode_message.EncodeTemplate": lambda: client.encode_message(template.issue(rooms=["Room 214"], valid_from=VALID_FROM, valid_till=VALID_TILL)),
+        "message.sanitize_text": lambda: Message.sanitize_text("Jöhn Döe, Anonymousville"),
+        "message.transliterate.latin1": lambda: Message._transliterate("Jöhn Döe, Anonymousville"),
+        "message.transliterate.translitcodec": lambda: Message._transliterate("Jöhn Döe, Łódź"),
+        "message.decode": lambda: Message.decode(AUDIT_RESPONSE[1:-2]),
+        "response.encode": lambda: Response(ENCODE_RESPONSE).message,
+        "response.audit": lambda: Response(AUDIT_RESPONSE).message,
+        "response.mobile": lambda: Response(MOBILE_RESPONSE).message,
+        "card_details.decode": read_card_details,
+    })
+    for size, payload in payloads.items():
+        benchmarks[f"common.lrc.{size}"] = (lambda data: lambda: common.lrc(data))(payload[:size])
+    return benchmarks
+
+
+# Runs each benchmark `repeat` times for ~`min_time` seconds and reports the fastest run, which is the least disturbed one
+def run_micro_benchmarks(benchmarks: Dict[str, Callable[[], Any]], repeat: int, min_time: float) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, benchmark in benchmarks.items():
+        timer = timeit.Timer(benchmark)
+        number, elapsed = timer.autorange()
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = {"mean_us": best * 1e6, "ops_per_second": 1 / best}
+    return results
+
+
+# Requests per second and latency percentiles of full requests against the mock interface on loopback
+def run_round_trips(requests: int, pooled: bool) -> Dict[str, float]:
+    with MockServer() as server:
+        client = Client(server.endpoint, pool=ConnectionPool(max_size=1) if pooled else None)
+        message = Checkout(room="Room 214")
+        latencies: List[float] = []
+
+        started = perf_counter()
+        for _ in range(requests):
+            request_started = perf_counter()
+            client.send_message(message)
+            latencies.append(perf_counter() - request_started)
+        elapsed = perf_counter() - started
+
+        if client.pool is not None:
+            client.pool.close()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": requests,
+        "requests_per_second": requests / elapsed,
+        "p50_ms": quantiles[49] * 1e3,
+        "p99_ms": quantiles[98] * 1e3,
+    }
+
+
+# Best and median import time over `repeat` fresh interpreters, measured inside them so interpreter startup is not counted,
+# and the heavy modules the import loaded although the startup path does not need them
+def run_import_time(repeat: int) -> Dict[str, Any]:
+    code = (f"from time import perf_counter; started = perf_counter(); {IMPORT_STATEMENT}; elapsed = perf_counter() - started; "
+            f"import sys; print(elapsed, *[name for name in {HEAVY_MODULES!r} if name in sys.modules])")
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)}
+
+    timings: List[float] = []
+    loaded: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=environment).stdout.split()
+        timings.append(float(output[0]))
+        loaded = output[1:]
+
+    return {
+        "statement": IMPORT_STATEMENT,
+        "best_ms": min(timings) * 1e3,
+        "median_ms": statistics.median(timings) * 1e3,
+        "budget_ms": IMPORT_BUDGET_MS,
+        "heavy_modules_loaded": loaded,
+    }
+
+
+def run(repeat: int = 5, min_time: float = 0.2, requests: int = 2000, only: Optional[str] = None) -> Dict[str, Any]:
+    benchmarks = {name: benchmark for name, benchmark in micro_benchmarks().items() if only is None or only in name}
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "micro": run_micro_benchmarks(benchmarks, repeat, min_time),
+        "round_trip": {
+            "connection_per_request": run_round_trips(requests, pooled=False),
+            "pooled": run_round_trips(requests, pooled=True),
+        } if only is None or only.startswith("round_trip") else {},
+        "import_time": run_import_time(max(repeat, 5)) if only is None or only.startswith("import") else {},
+    }
+
+
+# python -m salto.testing.benchmark --output bench.json
+# python -m salto.testing.benchmark --compare previous.json
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks of the Salto client hot paths")
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to report relative changes against")
+    parser.add_argument("--only", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repetition of a micro benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per round trip benchmark")
+    parser.add_argument("--check-import-budget", action="store_true",
+                        help=f"exit with status 1 when the import takes longer than {IMPORT_BUDGET_MS:g} ms or loads heavy modules")
+    arguments = parser.parse_args()
+
+    results = run(arguments.repeat, arguments.min_time, arguments.requests, arguments.only)
+
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            previous = json.load(file)
+        for name, result in results["micro"].items():
+            if name in previous.get("micro", {}):
+                change = result["mean_us"] / previous["micro"][name]["mean_us"] - 1
+                print(f"{name:40} {result['mean_us']:10.2f} us {change:+8.1%}", file=sys.stderr)
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    import_time = results["import_time"]
+    if arguments.check_import_budget and import_time and (import_time["best_ms"] > IMPORT_BUDGET_MS or import_time["heavy_modules_loaded"]):
+        print(f"Import budget exceeded: {import_time['best_ms']:.1f} ms (budget {IMPORT_BUDGET_MS:g} ms), "
+              f"heavy modules loaded: {import_time['heavy_modules_loaded']}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import random
+import socket
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from time import sleep
+from typing import Dict, List, Optional, Set
+
+from salto import common
+from salto.audit.audit_record import AuditRecord
+from salto.message import Message
+from salto.protocol import FrameParser
+from salto.support.card_details import CardDetails
+
+
+# Stand-in for the Salto PC interface to develop and load test against. It speaks the same framing, answers the PMS commands
+# with realistic payloads and handles every connection on its own thread.
+#
+# with MockServer(latency=0.01, card_wait=0.5, ov_rate=0.05) as server:
+#     client = Client(server.endpoint)
+#     client.send_message(EncodeCard(amount=1, encoder="Online Encoder 1", rooms=["Room 1"]))
+class MockServer:
+    ENCODER_COMMANDS = ("CN", "CC", "CA", "LT", "L", "P")
+    AUDIT_TRAIL_LENGTH = 20
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.0,  # seconds before each answer
+                 card_wait: float = 0.0,  # seconds the encoder commands take, i.e. the time to present a card
+                 nak_rate: float = 0.0,  # share of messages answered with NAK
+                 ov_rate: float = 0.0,  # share of encoder commands answered with an overflow (OV) error
+                 audit_trail_length: int = AUDIT_TRAIL_LENGTH,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.card_wait = card_wait
+        self.nak_rate = nak_rate
+        self.ov_rate = ov_rate
+        self.audit_trail_length = audit_trail_length
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+
+        self._lock = threading.Lock()
+        self._busy_encoders: Set[str] = set()
+        self._audit_positions: Dict[str, int] = {}
+        self._server = MockServer.TCPServer((host, port), MockServer.RequestHandler)
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="salto-mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # Returns the bytes to send back for a single frame received from the PMS
+    def answer(self, frame: bytes) -> bytes:
+        if self.latency:
+            sleep(self.latency)
+
+        if frame == common.ENQ:
+            return common.ACK
+        if not frame.startswith(common.STX):
+            return common.NAK
+
+        raw_message, lrc = frame[1:-2], frame[-1:]
+        if lrc != common.LRC_SKIP and common.lrc(raw_message) != lrc:
+            return common.NAK
+
+        with self._lock:
+            self.requests += 1
+            nak = self.random.random() < self.nak_rate
+        if nak:
+            return common.NAK
+
+        message = Message.decode(raw_message)
+        return common.ACK + self._frame(self._respond(message))
+
+    def _respond(self, message: Message) -> List[bytes]:
+        command = message.str_field(0)
+        if command.startswith(("W", "CO", "CNM", "CCM")):
+            return self._respond_unbound(message, command)
+
+        if not command.startswith(MockServer.ENCODER_COMMANDS) or len(message.fields) < 2:
+            return [b"ES"]
+
+        encoder = message.str_field(1)
+        with self._lock:
+            overflow = encoder in self._busy_encoders or self.random.random() < self.ov_rate
+            if not overflow:
+                self._busy_encoders.add(encoder)
+        if overflow:
+            return [b"OV"]
+
+        try:
+            if self.card_wait:
+                sleep(self.card_wait)
+            return self._respond_encoder(message, command)
+        finally:
+            with self._lock:
+                self._busy_encoders.discard(encoder)
+
+    def _respond_unbound(self, message: Message, command: str) -> List[bytes]:
+        if command in ("WF", "WN", "WR"):
+            return self._respond_audit(command, message.str_field(1))
+        if command == "CO":
+            return message.fields
+        if command in ("CNM", "CCM"):
+            return [message.fields[0], message.fields[1]]
+        return [b"ES"]
+
+    def _respond_encoder(self, message: Message, command: str) -> List[bytes]:
+        encoder = message.fields[1]
+        if command.startswith(("CN", "CC", "CA")):
+            return [message.fields[0], encoder, b"%014X" % self.random.getrandbits(56)]
+        if command == "LT":
+            now = datetime.now()
+            return [
+                b"LT", encoder, b"Room 1", b"", b"", b"", b"CI", b"0", CardDetails.encode_authorizations([1, 2, 3]),
+                Message.encode_str(now.strftime(CardDetails.DATETIME_FORMAT)),
+                Message.encode_str((now + timedelta(days=2)).strftime(CardDetails.DATETIME_FORMAT)),
+                b"Front desk",
+            ]
+        if command.startswith("L"):
+            return [message.fields[0], encoder, Message.encode_str("Track data " + command[1:])]
+        if command.startswith("P"):
+            return [message.fields[0], encoder]
+        return [b"ES"]
+
+    # Every door has the same synthetic trail of openings, one per hour, ending an hour ago
+    def _respond_audit(self, command: str, door_identification: str) -> List[bytes]:
+        with self._lock:
+            position = self._audit_positions.get(door_identification)
+            if command == "WF":
+                position = 0
+            elif command == "WN":
+                position = None if position is None else position + 1
+            elif position is None:  # 'WR' before any 'WF' or 'WN'
+                return [b"WO"]
+            self._audit_positions[door_identification] = position
+
+        if position is None or position >= self.audit_trail_length:
+            return [b"WO"]
+
+        incident_datetime = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=self.audit_trail_length - position)
+        date_field, _, time_field = incident_datetime.strftime(AuditRecord.DATETIME_FORMAT).partition(" ")
+        return [
+            Message.encode_str(command), Message.encode_str(door_identification), Message.encode_str(date_field),
+            Message.encode_str(time_field), AuditRecord.Incident.OPEN.value, b"I", b"Room %-3d" % (position % 100), b"#0", b"",
+        ]
+
+    @staticmethod
+    def _frame(fields: List[bytes]) -> bytes:
+        raw_message = bytes(Message(fields))
+        return common.STX + raw_message + common.ETX + common.lrc(raw_message)
+
+    class TCPServer(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+        request_queue_size = 128
+        mock: "MockServer"
+
+    class RequestHandler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            mock: MockServer = self.server.mock  # type: ignore[attr-defined]
+            with mock._lock:
+                mock.connections += 1
+
+            parser = FrameParser()
+            conn: socket.socket = self.request
+            while True:
+                try:
+                    chunk = conn.recv(4096)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+
+                parser.feed(chunk)
+                for frame in parser.frames():
+                    conn.sendall(mock.answer(frame))
+
+
+# python -m salto.testing.mock_server --port 8090 --latency 0.01 --card-wait 2
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock Salto PMS interface")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--card-wait", type=float, default=0.0)
+    parser.add_argument("--nak-rate", type=float, default=0.0)
+    parser.add_argument("--ov-rate", type=float, default=0.0)
+    arguments = parser.parse_args()
+
+    server = MockServer(arguments.host, arguments.port, arguments.latency, arguments.card_wait, arguments.nak_rate, arguments.ov_rate)
+    print(f"Mock Salto interface listening on {server.endpoint}")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import socket
+import socketserver
+import threading
+from collections import deque
+from time import sleep
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+from salto.capture import WireCapture
+from salto.protocol import FrameParser
+
+
+# Serves the sessions of a wire capture back over a local socket, to reproduce what a client saw in production: latency
+# profiles, NAK storms, audit trail walks, ... Every connection accepted replays the next recorded connection, in the
+# order the connections appear in the capture (connections are told apart by capture session and number). Each frame
+# received is answered with the frames that followed it in the recording, after the same delay divided by `speed`.
+#
+# Record with a capture on the live client:
+#     client = Client("192.168.1.120:8090", capture=WireCapture("slow-encodings.cap"))
+#
+# and replay it, ten times faster:
+#     with ReplayServer("slow-encodings.cap", speed=10) as server:
+#         client = Client(server.endpoint)
+#         ...
+class ReplayServer:
+    class Session:
+        def __init__(self, connection: int, records: List[WireCapture.Record], session: int = 0):
+            self.session = session  # session of the capture, connection numbers restart with every session
+            self.connection = connection
+            self.records = records
+
+        # The frames the client sent, each with the answers (delay in seconds, frame) that followed it
+        def exchanges(self) -> List[Tuple[bytes, List[Tuple[float, bytes]]]]:
+            exchanges: List[Tuple[bytes, List[Tuple[float, bytes]]]] = []
+            previous_timestamp = self.records[0].timestamp if self.records else 0.0
+            for record in self.records:
+                if record.direction == WireCapture.OUT:
+                    exchanges.append((record.frame, []))
+                elif exchanges:  # frames received before anything was sent can't be triggered
+                    exchanges[-1][1].append((max(record.timestamp - previous_timestamp, 0.0), record.frame))
+                previous_timestamp = record.timestamp
+            return exchanges
+
+    class Mismatch:
+        def __init__(self, connection: int, expected: Optional[bytes], received: bytes, session: int = 0):
+            self.session = session
+            self.connection = connection
+            self.expected = expected
+            self.received = received
+
+        def __repr__(self) -> str:
+            return f"Mismatch(session={self.session}, connection={self.connection}, expected={self.expected!r}, received={self.received!r})"
+
+    def __init__(self,
+                 capture: Union[str, List[WireCapture.Record]],
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 speed: float = 1.0,  # 1 replays at the recorded pace, 10 ten times faster, 0 without any delay
+                 strict: bool = False,  # close the connection on a request which differs from the recording
+                 loop: bool = False):  # start over with the first session once all have been replayed
+        records = list(WireCapture.read(capture)) if isinstance(capture, str) else capture
+        by_connection: Dict[Tuple[int, int], List[WireCapture.Record]] = {}
+        for record in records:
+            by_connection.setdefault((record.session, record.connection), []).append(record)
+
+        self.sessions = [ReplayServer.Session(connection, connection_records, session)
+                         for (session, connection), connection_records in by_connection.items()]
+        self.speed = speed
+        self.strict = strict
+        self.loop = loop
+        self.mismatches: List[ReplayServer.Mismatch] = []
+        self.connections = 0
+
+        self._lock = threading.Lock()
+        self._pending: Deque[ReplayServer.Session] = deque(self.sessions)
+        self._server = ReplayServer.TCPServer((host, port), ReplayServer.RequestHandler)
+        self._server.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    # True once every recorded session has been served
+    @property
+    def is_exhausted(self) -> bool:
+        with self._lock:
+            return not self._pending and not self.loop
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="salto-replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _next_session(self) -> Optional["ReplayServer.Session"]:
+        with self._lock:
+            self.connections += 1
+            if not self._pending and self.loop:
+                self._pending.extend(self.sessions)
+            return self._pending.popleft() if self._pending else None
+
+    def _mismatch(self, session: "ReplayServer.Session", expected: Optional[bytes], received: bytes) -> None:
+        with self._lock:
+            self.mismatches.append(ReplayServer.Mismatch(session.connection, expected, received, session.session))
+
+    def _delay(self, seconds: float) -> None:
+        if self.speed > 0 and seconds > 0:
+            sleep(seconds / self.speed)
+
+    class TCPServer(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+        request_queue_size = 128
+        replay: "ReplayServer"
+
+    class RequestHandler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            replay: ReplayServer = self.server.replay  # type: ignore[attr-defined]
+            session = replay._next_session()
+            if session is None:
+                return  # nothing left to replay, the connection is closed right away
+
+            exchanges = deque(session.exchanges())
+            parser = FrameParser()
+            conn: socket.socket = self.request
+            while True:
+                try:
+                    chunk = conn.recv(4096)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+
+                parser.feed(chunk)
+                for frame in parser.frames():
+                    if not exchanges:
+                        replay._mismatch(session, None, frame)
+                        return
+
+                    expected, answers = exchanges.popleft()
+                    if frame != expected:
+                        replay._mismatch(session, expected, frame)
+                        if replay.strict:
+                            return
+
+                    for delay, answer in answers:
+                        replay._delay(delay)
+                        conn.sendall(answer)
+
+
+# python -m salto.testing.replay_server slow-encodings.cap --port 8090 --speed 10
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a SALTO wire capture as a PMS interface")
+    parser.add_argument("capture")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor, 0 for no delays at all")
+    parser.add_argument("--strict", action="store_true", help="close connections on requests differing from the recording")
+    parser.add_argument("--loop", action="store_true", help="replay the sessions over and over")
+    arguments = parser.parse_args()
+
+    server = ReplayServer(arguments.capture, arguments.host, arguments.port, arguments.speed, arguments.strict, arguments.loop)
+    print(f"Replaying {len(server.sessions)} sessions on {server.endpoint}")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from salto.audit.audit_cursor import AuditCursor, AuditCursorStore
+from salto.audit.audit_record import AuditRecord
+from salto.audit.audit_trail import AuditTrail, AuditWalk
+from salto.client import Client
+from salto.message import Message
+from salto.testing import mock_server
+from salto.testing.mock_server import MockServer
+
+
+# The mock trail ends an hour before now, freeze it so two walks see the same incidences
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    now = datetime.now().replace(second=0, microsecond=0)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(mock_server, "datetime", FrozenDatetime)
+
+
+@pytest.fixture
+def cursor_store(tmp_path) -> AuditCursorStore:
+    return AuditCursorStore(str(tmp_path / "cursors.json"))
+
+
+def rooms(audit_records) -> list:
+    return [audit_record.card_identification for audit_record in audit_records if not audit_record.is_end_of_trail]
+
+
+def test_iterate_yields_the_trail_up_to_the_end_of_trail_record():
+    with MockServer(audit_trail_length=5) as server:
+        audit_records = list(AuditTrail.iterate(Client(server.endpoint), "Room 214"))
+
+    assert rooms(audit_records) == ["Room 0", "Room 1", "Room 2", "Room 3", "Room 4"]
+    assert audit_records[-1].is_end_of_trail
+
+
+def test_record_whose_processing_raised_is_delivered_again(cursor_store):
+    with MockServer(audit_trail_length=5) as server:
+        client = Client(server.endpoint)
+        processed = []
+        with pytest.raises(RuntimeError):
+            for audit_record in AuditTrail.iterate(client, "Room 214", cursor_store):
+                if audit_record.card_identification == "Room 2":
+                    raise RuntimeError("poller crashed")
+                processed.append(audit_record)
+
+        audit_records = list(AuditTrail.iterate(client, "Room 214", cursor_store))
+
+    assert rooms(processed) == ["Room 0", "Room 1"]
+    assert rooms(audit_records) == ["Room 2", "Room 3", "Room 4"]
+
+
+def test_walk_falls_back_to_wf_after_the_interface_restarted(cursor_store):
+    with MockServer(audit_trail_length=5) as server:
+        for audit_record in AuditTrail.iterate(Client(server.endpoint), "Room 214", cursor_store):
+            if audit_record.card_identification == "Room 1":
+                break
+
+    with MockServer(audit_trail_length=5) as restarted_server:
+        audit_records = list(AuditTrail.iterate(Client(restarted_server.endpoint), "Room 214", cursor_store))
+
+    assert rooms(audit_records) == ["Room 1", "Room 2", "Room 3", "Room 4"]
+    assert audit_records[-1].is_end_of_trail
+
+
+def test_resumed_walk_starts_with_wr_and_switches_to_wf_on_end_of_trail(cursor_store):
+    cursor_store.save(AuditCursor("Room 214", datetime(2026, 3, 1, 2), "Room 1"))
+    walk = AuditWalk("Room 214", cursor_store)
+
+    assert walk.next_message().fields[0] == b"WR"
+    assert walk.accept(AuditRecord(Message([b"WO"]))) is False
+    assert not walk.is_finished
+    assert walk.next_message().fields[0] == b"WF"
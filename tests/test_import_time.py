@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from salto.testing.benchmark import IMPORT_BUDGET_MS, run_import_time
+
+
+def test_client_import_leaves_heavy_modules_unloaded():
+    result = run_import_time(repeat=1)
+
+    assert result["heavy_modules_loaded"] == []
+
+
+# Wall clock timings depend on the machine, so the budget is only enforced where it was calibrated:
+# SALTO_CHECK_IMPORT_BUDGET=1 python -m pytest tests/test_import_time.py
+@pytest.mark.skipif(not os.environ.get("SALTO_CHECK_IMPORT_BUDGET"), reason="set SALTO_CHECK_IMPORT_BUDGET=1 to enforce the import budget")
+def test_client_import_stays_within_budget():
+    result = run_import_time(repeat=5)
+
+    assert result["best_ms"] <= IMPORT_BUDGET_MS, f"importing took {result['best_ms']:.1f}ms, budget {IMPORT_BUDGET_MS}ms"
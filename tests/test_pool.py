@@ -0,0 +1,47 @@
+import socket
+
+import pytest
+
+from salto.client import Client
+from salto.messages.checkout import Checkout
+from salto.pool import ConnectionPool
+from salto.testing.mock_server import MockServer
+
+
+def test_pooled_client_reuses_its_socket():
+    with MockServer() as server, ConnectionPool() as pool:
+        client = Client(server.endpoint, pool=pool)
+        for room in ["Room 1", "Room 2", "Room 3"]:
+            assert client.send_message(Checkout(room=room)).is_message
+
+        assert server.connections == 1
+
+
+def test_socket_of_a_failed_block_is_discarded():
+    with MockServer() as server, ConnectionPool() as pool:
+        client = Client(server.endpoint, pool=pool)
+        with pytest.raises(RuntimeError):
+            with client.connection():
+                raise RuntimeError("conversation in an unknown state")
+
+        assert client.send_message(Checkout(room="Room 1")).is_message
+        assert server.connections == 2
+
+
+def test_dead_idle_socket_is_replaced_after_the_health_check():
+    with MockServer() as server, ConnectionPool() as pool:
+        client = Client(server.endpoint, pool=pool)
+        with client.connection() as conn:
+            assert ConnectionPool.is_healthy(client, conn)
+        conn.shutdown(socket.SHUT_RDWR)  # the interface dropped the idle connection
+
+        assert client.send_message(Checkout(room="Room 1")).is_message
+        assert server.connections == 2
+
+
+def test_acquire_times_out_when_all_sockets_are_in_use():
+    with MockServer() as server, ConnectionPool(max_size=1, acquire_timeout=0.1) as pool:
+        client = Client(server.endpoint, pool=pool)
+        with client.connection():
+            with pytest.raises(ConnectionPool.Exhausted):
+                pool.acquire(client)
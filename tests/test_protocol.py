@@ -0,0 +1,78 @@
+import socket
+
+import pytest
+
+from salto import common
+from salto.client import Client
+from salto.messages.checkout import Checkout
+from salto.protocol import FrameParser
+from salto.testing.mock_server import MockServer
+
+CHECKOUT = Checkout(room="Room 1").frame()
+
+
+def test_frame_split_over_many_chunks():
+    parser = FrameParser()
+    for index in range(len(CHECKOUT) - 1):
+        parser.feed(CHECKOUT[index:index + 1])
+        assert not parser.has_frame
+
+    parser.feed(CHECKOUT[-1:])
+    assert list(parser.frames()) == [CHECKOUT]
+
+
+# The LRC follows ETX and may arrive in the next chunk
+def test_frame_waits_for_the_lrc_after_etx():
+    parser = FrameParser()
+    parser.feed(CHECKOUT[:-1])
+    assert not parser.has_frame
+
+    parser.feed(CHECKOUT[-1:])
+    assert parser.next_frame() == CHECKOUT
+
+
+def test_acknowledgement_and_response_in_one_chunk():
+    parser = FrameParser()
+    parser.feed(common.ACK + CHECKOUT + common.NAK)
+
+    assert list(parser.frames()) == [common.ACK, CHECKOUT, common.NAK]
+
+
+def test_garbage_bytes_are_handed_over_one_by_one():
+    parser = FrameParser()
+    parser.feed(b"xy" + CHECKOUT)
+
+    assert list(parser.frames()) == [b"x", b"y", CHECKOUT]
+
+
+def test_flush_returns_the_incomplete_frame():
+    parser = FrameParser()
+    parser.feed(CHECKOUT[:5])
+
+    assert parser.flush() == CHECKOUT[:5]
+    assert parser.flush() == b""
+
+
+def test_round_trip_through_the_mock_server():
+    with MockServer() as server:
+        response = Client(server.endpoint).send_message(Checkout(room="Room 1"))
+
+    assert response.is_message
+    assert response.message.fields == Checkout(room="Room 1").fields
+
+
+def test_invalid_acknowledgement_is_rejected():
+    client_end, server_end = socket.socketpair()
+    with client_end, server_end:
+        server_end.sendall(b"x")
+        with pytest.raises(Client.InvalidAcknowledgement):
+            Client("127.0.0.1:0")._send_request(client_end, CHECKOUT)
+
+
+def test_connection_closed_after_the_ack_raises():
+    client_end, server_end = socket.socketpair()
+    with client_end, server_end:
+        server_end.sendall(common.ACK)
+        server_end.shutdown(socket.SHUT_WR)  # the interface hangs up instead of sending the response
+        with pytest.raises(ConnectionResetError):
+            Client("127.0.0.1:0")._send_request(client_end, CHECKOUT)
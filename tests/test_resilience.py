@@ -0,0 +1,133 @@
+import random
+
+import pytest
+
+from salto.client import Client
+from salto.messages.encode_card import EncodeCard
+from salto.resilience import Backoff, CircuitBreaker
+from salto.testing.mock_server import MockServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def open_breaker(key: str = "interface") -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, cool_down=10.0, clock=FakeClock())
+    for _ in range(3):
+        breaker.failure(key)
+    return breaker
+
+
+def encode(encoder: str) -> EncodeCard:
+    return EncodeCard(amount=1, encoder=encoder, rooms=["Room 1"])
+
+
+def test_circuit_opens_after_the_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, cool_down=10.0, clock=FakeClock())
+    breaker.failure("interface")
+    breaker.failure("interface")
+    assert breaker.acquire("interface") is False
+
+    breaker.failure("interface")
+    breaker.clock.now = 4.0
+    with pytest.raises(CircuitBreaker.Open) as error:
+        breaker.acquire("interface")
+
+    assert error.value.key == "interface"
+    assert error.value.retry_in == pytest.approx(6.0)
+
+
+def test_single_probe_after_the_cool_down():
+    breaker = open_breaker()
+    breaker.clock.now = 10.0
+
+    assert breaker.acquire("interface") is True
+    assert breaker.state("interface") == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitBreaker.Open):
+        breaker.acquire("interface")
+
+
+def test_probe_success_closes_the_circuit():
+    breaker = open_breaker()
+    breaker.clock.now = 10.0
+    breaker.acquire("interface")
+
+    breaker.success("interface")
+
+    assert breaker.state("interface") == CircuitBreaker.CLOSED
+    assert breaker.acquire("interface") is False
+
+
+def test_probe_failure_starts_a_new_cool_down():
+    breaker = open_breaker()
+    breaker.clock.now = 10.0
+    breaker.acquire("interface")
+
+    breaker.failure("interface")
+
+    assert breaker.state("interface") == CircuitBreaker.OPEN
+    breaker.clock.now = 19.0
+    with pytest.raises(CircuitBreaker.Open):
+        breaker.acquire("interface")
+    breaker.clock.now = 20.0
+    assert breaker.acquire("interface") is True
+
+
+def test_released_probe_lets_the_next_caller_probe_right_away():
+    breaker = open_breaker()
+    breaker.clock.now = 10.0
+    breaker.acquire("interface")
+
+    breaker.release("interface")
+
+    assert breaker.state("interface") == CircuitBreaker.OPEN
+    assert breaker.acquire("interface") is True
+
+
+def test_failing_encoder_fails_fast_without_opening_the_endpoint(monkeypatch):
+    with MockServer() as server:
+        monkeypatch.setattr(server, "_respond_encoder", lambda message, command: [b"NC"])
+        breaker = CircuitBreaker(failure_threshold=3, cool_down=10.0, clock=FakeClock())
+        client = Client(server.endpoint, breaker=breaker)
+        for _ in range(3):
+            assert client.send_message(encode("Online Encoder 1")).message.error_code == "NC"
+
+        requests = server.requests
+        with pytest.raises(CircuitBreaker.Open):
+            client.send_message(encode("Online Encoder 1"))
+
+        assert server.requests == requests
+        assert breaker.state(server.endpoint) == CircuitBreaker.CLOSED
+        assert breaker.state(f"{server.endpoint}/Online Encoder 1") == CircuitBreaker.OPEN
+        assert client.send_message(encode("Online Encoder 2")).message.error_code == "NC"
+
+
+def test_encoder_probe_is_handed_back_when_the_endpoint_is_open():
+    with MockServer() as server:
+        encoder_key = f"{server.endpoint}/Online Encoder 1"
+        breaker = CircuitBreaker(failure_threshold=1, cool_down=10.0, clock=FakeClock())
+        breaker.failure(encoder_key)
+        breaker.clock.now = 5.0
+        breaker.failure(server.endpoint)
+        breaker.clock.now = 10.0
+        client = Client(server.endpoint, breaker=breaker)
+
+        with pytest.raises(CircuitBreaker.Open) as error:
+            client.send_message(encode("Online Encoder 1"))
+
+        assert error.value.key == server.endpoint
+        assert server.requests == 0
+        assert breaker.state(encoder_key) == CircuitBreaker.OPEN
+        assert breaker.acquire(encoder_key) is True
+
+
+def test_backoff_grows_up_to_the_maximum_within_the_jitter():
+    backoff = Backoff(initial=0.2, multiplier=2.0, maximum=1.0, jitter=0.5, random_source=random.Random(1))
+
+    for attempt, delay in [(1, 0.2), (2, 0.4), (3, 0.8), (4, 1.0), (10, 1.0)]:
+        assert delay * 0.5 <= backoff.delay(attempt) <= delay